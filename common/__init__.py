@@ -0,0 +1,7 @@
+"""
+Код, общий для проектов ya_news и ya_note.
+
+Корень репозитория добавляют в sys.path точки входа проектов: manage.py,
+wsgi.py, asgi.py, pytest.ini и пакет benchmarks. Настройки на это
+не полагаются, поэтому common импортируется и до их загрузки.
+"""
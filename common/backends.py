@@ -0,0 +1,63 @@
+"""
+Бэкенд аутентификации с кешем пользователей.
+
+AuthenticationMiddleware на каждом запросе загружает пользователя
+из сессии отдельным запросом к базе. CachedModelBackend сначала ищет
+пользователя в кеше AUTH_USER_CACHE_ALIAS и обращается к базе только
+при промахе. Запись сбрасывается сигналами при сохранении и удалении
+пользователя и при выходе из системы; изменения через
+QuerySet.update() сигналов не отправляют, и после них запись нужно
+сбросить вручную функцией invalidate_user.
+
+Сброс виден другим процессам, только если кеш общий. С кешем в памяти
+процесса отключённый пользователь или сменённый пароль остались бы
+в силе у соседних процессов, поэтому AUTH_USER_CACHE_TIMEOUT = 0
+выключает кеш и пользователь читается из базы, как у ModelBackend.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def invalidate_user(user_id):
+    """
+    Сбрасываем запись сразу и ещё раз после фиксации транзакции:
+    параллельный запрос мог успеть закешировать старую строку.
+    """
+    key = user_cache_key(user_id)
+    get_user_cache().delete(key)
+    transaction.on_commit(lambda: get_user_cache().delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username, password, **kwargs)
+        if user is None:
+            # Следом в AUTHENTICATION_BACKENDS стоит ModelBackend с той же
+            # проверкой: не даём ему хешировать пароль второй раз.
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
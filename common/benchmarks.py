@@ -0,0 +1,178 @@
+"""
+Общая обвязка бенчмарков ya_news и ya_note.
+
+Замер времени, перцентили, подсчёт SQL-запросов, нагрузка через
+WSGI-приложение и сохранение результатов в JSON. Пакет benchmarks
+каждого проекта реэкспортирует эти функции и добавляет к ним
+setup_django со своими настройками.
+"""
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from wsgiref.util import setup_testing_defaults
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Создаёт на время бенчмарка отдельную тестовую базу.
+
+    По умолчанию SQLite создаёт её в памяти; name задаёт файл,
+    с которым, как в рабочем окружении, каждый поток открывает
+    собственное соединение.
+    """
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """Возвращает время каждого из repeat вызовов func в секундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(title, timings):
+    print(
+        f'{title:<40} '
+        f'медиана {statistics.median(timings) * 1000:9.2f} мс, '
+        f'мин {min(timings) * 1000:9.2f} мс'
+    )
+
+
+def percentile(timings, percent):
+    """Перцентиль по отсортированной выборке, без интерполяции."""
+    ordered = sorted(timings)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def session_cookie(user):
+    """Возвращает cookie с сессией, в которой user уже авторизован."""
+    from django.test import Client
+    client = Client()
+    client.force_login(user)
+    return client.cookies.output(attrs=[], header='', sep=';').strip()
+
+
+def wsgi_request(application, path, cookie=''):
+    """Выполняет GET-запрос через WSGI-приложение и возвращает код ответа."""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'HTTP_HOST': 'testserver',
+        'SERVER_NAME': 'testserver',
+    }
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    setup_testing_defaults(environ)
+    status = []
+
+    def start_response(response_status, headers, exc_info=None):
+        status.append(int(response_status.split()[0]))
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        # close() отправляет request_finished, как это делает WSGI-сервер.
+        result.close()
+    return status[0]
+
+
+def _timed_requests(application, path, cookie, count):
+    """Выполняет count запросов в текущем потоке."""
+    from django.db import connection
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    timings, statuses = [], []
+    with connection.execute_wrapper(count_queries):
+        for _ in range(count):
+            start = time.perf_counter()
+            statuses.append(wsgi_request(application, path, cookie))
+            timings.append(time.perf_counter() - start)
+    return timings, statuses, queries
+
+
+def run_load(application, routes, requests, workers):
+    """
+    Нагружает каждый маршрут requests запросами из workers потоков.
+
+    routes — словарь «имя: (путь, cookie)». Для каждого маршрута
+    возвращает перцентили задержки, запросы в секунду и среднее число
+    SQL-запросов на HTTP-запрос.
+    """
+    results = {}
+    per_worker = max(1, requests // workers)
+    for name, (path, cookie) in routes.items():
+        with ThreadPoolExecutor(workers) as executor:
+            start = time.perf_counter()
+            parts = list(executor.map(
+                lambda _: _timed_requests(
+                    application, path, cookie, per_worker
+                ),
+                range(workers)
+            ))
+            elapsed = time.perf_counter() - start
+        timings = [timing for part in parts for timing in part[0]]
+        statuses = sorted({status for part in parts for status in part[1]})
+        results[name] = {
+            'path': path,
+            'requests': len(timings),
+            'statuses': statuses,
+            'p50_ms': percentile(timings, 50) * 1000,
+            'p95_ms': percentile(timings, 95) * 1000,
+            'p99_ms': percentile(timings, 99) * 1000,
+            'rps': len(timings) / elapsed,
+            'queries_per_request': (
+                sum(part[2] for part in parts) / len(timings)
+            ),
+        }
+    return results
+
+
+def print_results(results, baseline=None):
+    """Печатает таблицу результатов, при наличии — с изменением p95."""
+    for name, row in results.items():
+        line = (
+            f'{name:<24} p50 {row["p50_ms"]:8.2f} мс  '
+            f'p95 {row["p95_ms"]:8.2f} мс  p99 {row["p99_ms"]:8.2f} мс  '
+            f'{row["rps"]:8.1f} rps  {row["queries_per_request"]:5.1f} SQL'
+        )
+        if baseline and name in baseline:
+            before = baseline[name]['p95_ms']
+            line += f'  p95 {(row["p95_ms"] - before) / before:+.0%}'
+        print(line)
+
+
+def save_results(path, payload):
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(payload, results_file, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)['routes']
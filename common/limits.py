@@ -0,0 +1,10 @@
+"""Границы значений, которые можно передать в SQL-запрос."""
+
+# SQLite и другие базы хранят целые в 64 битах со знаком; большее
+# значение в параметре запроса приводит к OverflowError.
+SQL_INTEGER_MIN = -2 ** 63
+SQL_INTEGER_MAX = 2 ** 63 - 1
+
+
+def fits_sql_integer(value):
+    return SQL_INTEGER_MIN <= value <= SQL_INTEGER_MAX
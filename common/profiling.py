@@ -0,0 +1,178 @@
+"""
+Профилирование запросов.
+
+ProfilingMiddleware включается настройкой REQUEST_PROFILING. Для каждого
+запроса она считает число и время SQL-запросов, время отрисовки шаблона
+и время работы представления, отдаёт их в заголовке Server-Timing и
+копит скользящую статистику по имени маршрута. Полный профиль cProfile
+снимается для доли запросов REQUEST_PROFILING_SAMPLE_RATE или по заголовку
+REQUEST_PROFILING_HEADER — последний принимается только при DEBUG или от
+сотрудника (is_staff). В каталоге REQUEST_PROFILING_DUMP_DIR хранятся
+не больше REQUEST_PROFILING_MAX_DUMPS последних профилей.
+"""
+import cProfile
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(
+    lambda: deque(maxlen=settings.REQUEST_PROFILING_WINDOW)
+)
+
+
+def _mean_ms(samples, key):
+    return statistics.mean(sample[key] for sample in samples) * 1000
+
+
+def profiling_summary():
+    """Сводка по последним запросам каждого маршрута, в миллисекундах."""
+    with _stats_lock:
+        snapshot = {name: list(samples) for name, samples in _stats.items()}
+    summary = {}
+    for name, samples in snapshot.items():
+        totals = [sample['total'] * 1000 for sample in samples]
+        summary[name] = {
+            'requests': len(samples),
+            'total_median': statistics.median(totals),
+            'total_max': max(totals),
+            'sql_count_mean': statistics.mean(
+                sample['sql_count'] for sample in samples
+            ),
+            'sql_mean': _mean_ms(samples, 'sql'),
+            'template_mean': _mean_ms(samples, 'template'),
+            'view_mean': _mean_ms(samples, 'view'),
+        }
+    return summary
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        # Файл успел удалить другой процесс.
+        return 0
+
+
+def reset_profiling_summary():
+    with _stats_lock:
+        _stats.clear()
+
+
+class ProfilingMiddleware:
+    """
+    Замеряет SQL, шаблоны и представление каждого запроса.
+
+    Время SQL-запросов, выполненных во время отрисовки шаблона, входит
+    и в sql, и в template; view — всё время обработки без отрисовки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        header = settings.REQUEST_PROFILING_HEADER.upper().replace('-', '_')
+        self.header = f'HTTP_{header}'
+
+    def __call__(self, request):
+        timings = {'sql': 0.0, 'sql_count': 0, 'template': 0.0}
+        request.profiling_timings = timings
+        request.profiler = None
+
+        def sql_timer(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings['sql'] += time.perf_counter() - start
+                timings['sql_count'] += 1
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sql_timer))
+            try:
+                response = self.get_response(request)
+            finally:
+                if request.profiler is not None:
+                    request.profiler.disable()
+        timings['total'] = time.perf_counter() - start
+        timings['view'] = timings['total'] - timings['template']
+        name = self.route_name(request)
+        with _stats_lock:
+            _stats[name].append(timings)
+        response['Server-Timing'] = self.server_timing(timings)
+        if request.profiler is not None:
+            self.dump_profile(request.profiler, name)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Включает cProfile перед представлением.
+
+        К этому моменту AuthenticationMiddleware уже определила
+        пользователя, от которого зависит, принимать ли заголовок.
+        """
+        if self.should_profile(request):
+            request.profiler = cProfile.Profile()
+            request.profiler.enable()
+
+    def process_template_response(self, request, response):
+        """Подменяет render ответа, чтобы замерить отрисовку шаблона."""
+        render = response.render
+        timings = request.profiling_timings
+
+        def timed_render():
+            start = time.perf_counter()
+            try:
+                return render()
+            finally:
+                timings['template'] += time.perf_counter() - start
+
+        response.render = timed_render
+        return response
+
+    def should_profile(self, request):
+        if random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return True
+        if request.META.get(self.header) != '1':
+            return False
+        # Профиль стоит времени и места на диске, поэтому по заголовку
+        # его может снять только сотрудник или разработчик при DEBUG.
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(user and user.is_staff)
+
+    @staticmethod
+    def route_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match else 'unresolved'
+
+    @staticmethod
+    def server_timing(timings):
+        return ', '.join((
+            f'sql;dur={timings["sql"] * 1000:.2f};'
+            f'desc="{timings["sql_count"]} queries"',
+            f'template;dur={timings["template"] * 1000:.2f}',
+            f'view;dur={timings["view"] * 1000:.2f}',
+            f'total;dur={timings["total"] * 1000:.2f}',
+        ))
+
+    @staticmethod
+    def dump_profile(profiler, name):
+        directory = Path(settings.REQUEST_PROFILING_DUMP_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        safe_name = name.replace(':', '-')
+        profiler.dump_stats(
+            directory / f'{safe_name}-{time.time_ns()}.prof'
+        )
+        dumps = sorted(directory.glob('*.prof'), key=_mtime)
+        for path in dumps[:-settings.REQUEST_PROFILING_MAX_DUMPS]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,36 @@
+"""
+SQLite с настройкой соединения из OPTIONS.
+
+Подключается как ENGINE 'common.sqlite'. Помимо параметров
+sqlite3.connect в OPTIONS понимает:
+
+- pragmas — словарь PRAGMA, выполняемых на каждом новом соединении
+  (journal_mode, synchronous, busy_timeout и т. п.);
+- read_only — открыть файл базы только для чтения; так в ya_news
+  настраивается псевдоним-реплика, через который идут чтения страниц.
+"""
+from pathlib import Path
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        options = dict(self.settings_dict['OPTIONS'])
+        self.pragmas = options.pop('pragmas', {})
+        read_only = options.pop('read_only', False)
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('read_only', None)
+        if read_only and not self.is_in_memory_db():
+            params['database'] = (
+                f'{Path(params["database"]).resolve().as_uri()}?mode=ro'
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
@@ -0,0 +1,155 @@
+"""
+Разбор текста для полнотекстового поиска SQLite FTS5.
+
+В индекс записываются не исходные слова, а их основы (стеммер Snowball
+для русского языка), поэтому «новости», «новостей» и «новость» находят
+друг друга. Служебные слова не индексируются и не требуются в запросе.
+
+SearchIndex — таблица FTS5 с rowid, равным id записи: создание,
+обновление, перестроение и выборка id по релевантности. Для баз,
+отличных от SQLite, поиск отключён. Здесь же разбирается номер
+страницы поисковой выдачи.
+"""
+import re
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import connection
+from django.http import Http404
+
+# Токенизатор таблиц поиска; основы уже в нижнем регистре и без «ё».
+TOKENIZE = 'unicode61 remove_diacritics 2'
+STOP_WORDS = frozenset((
+    'а', 'без', 'в', 'во', 'да', 'для', 'до', 'же', 'за', 'и', 'из', 'или',
+    'к', 'ко', 'ли', 'на', 'над', 'не', 'ни', 'но', 'о', 'об', 'от', 'по',
+    'под', 'при', 'про', 'с', 'со', 'то', 'у', 'что',
+))
+# Дальше выдачу не листают; заодно OFFSET всегда помещается в целое
+# SQLite, и огромный номер страницы не приводит к OverflowError.
+MAX_PAGE = 1000
+INDEX_BATCH_SIZE = 500
+_WORD = re.compile(r'\w+')
+_stemmer = snowballstemmer.stemmer('russian')
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    return _stemmer.stemWord(word.lower().replace('ё', 'е'))
+
+
+def analyze(text):
+    """Разбивает текст на слова и приводит их к основам."""
+    return [
+        stem(word) for word in _WORD.findall(text)
+        if word.lower() not in STOP_WORDS
+    ]
+
+
+def match_words(query):
+    """
+    Превращает запрос в список основ для выражения MATCH.
+
+    Каждая основа берётся в кавычки, поэтому операторы FTS5 во вводе
+    не работают; повторы отбрасываются.
+    """
+    return ' '.join(f'"{word}"' for word in dict.fromkeys(analyze(query)))
+
+
+def parse_page(value):
+    """Номер страницы выдачи от 1 до MAX_PAGE; иначе — ошибка 404."""
+    try:
+        page = int(value)
+    except (TypeError, ValueError):
+        raise Http404('Некорректный номер страницы.')
+    if not 1 <= page <= MAX_PAGE:
+        raise Http404('Некорректный номер страницы.')
+    return page
+
+
+def is_enabled(using=connection):
+    return using.vendor == 'sqlite'
+
+
+class SearchIndex:
+    """
+    Таблица FTS5 для полнотекстового поиска по модели.
+
+    columns — колонки таблицы, weights — их веса в bm25. Строка индекса —
+    кортеж (id, значение колонки, ...); make_row приводит значения
+    к основам слов, подкласс может записывать колонку иначе.
+    """
+
+    def __init__(self, table, columns, weights):
+        self.table = table
+        self.columns = tuple(columns)
+        self.weights = tuple(weights)
+
+    @property
+    def create_table_sql(self):
+        return (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING '
+            f"fts5({', '.join(self.columns)}, tokenize='{TOKENIZE}')"
+        )
+
+    def make_row(self, pk, *values):
+        return (pk, *(' '.join(analyze(value)) for value in values))
+
+    def create(self, using=connection):
+        if is_enabled(using):
+            with using.cursor() as cursor:
+                cursor.execute(self.create_table_sql)
+
+    def index_rows(self, rows, using=connection):
+        """Добавляет или заменяет в индексе строки (id, значения колонок)."""
+        if not rows or not is_enabled(using):
+            return
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        with using.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                f"(rowid, {', '.join(self.columns)}) "
+                f'VALUES ({placeholders})',
+                [self.make_row(*row) for row in rows]
+            )
+
+    def remove(self, pk, using=connection):
+        if is_enabled(using):
+            with using.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {self.table} WHERE rowid = %s', [pk]
+                )
+
+    def rebuild(self, rows, batch_size=INDEX_BATCH_SIZE, using=connection):
+        """
+        Перестраивает индекс по строкам rows, пачками по batch_size.
+
+        Возвращает число проиндексированных строк.
+        """
+        if not is_enabled(using):
+            return 0
+        with using.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        indexed = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.index_rows(batch, using)
+                indexed += len(batch)
+                batch.clear()
+        self.index_rows(batch, using)
+        return indexed + len(batch)
+
+    def search(self, match, offset=0, limit=10, using=connection):
+        """Возвращает id строк, подходящих под match, от самых релевантных."""
+        if not match or not is_enabled(using):
+            return []
+        weights = ', '.join(['%s'] * len(self.weights))
+        with using.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {weights}), rowid DESC '
+                'LIMIT %s OFFSET %s',
+                [match, *self.weights, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
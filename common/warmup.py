@@ -0,0 +1,41 @@
+"""
+Предварительная компиляция шаблонов при старте приложения.
+
+С кеширующим загрузчиком (настройка TEMPLATES_PRECOMPILED) шаблон
+читается с диска и разбирается один раз на процесс. warm_up_templates,
+вызванная из ready() приложений news и notes, делает это для всех
+шаблонов из DIRS до первого запроса: первый посетитель не ждёт разбора,
+а ошибка синтаксиса в любом шаблоне останавливает запуск, а не всплывает
+на первом запросе к странице.
+"""
+from pathlib import Path
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_SUFFIX = '.html'
+
+
+def iter_template_names(directory):
+    """Имена шаблонов каталога в том виде, в каком их ищет загрузчик."""
+    directory = Path(directory)
+    for path in sorted(directory.rglob(f'*{TEMPLATE_SUFFIX}')):
+        yield path.relative_to(directory).as_posix()
+
+
+def warm_up_templates():
+    """
+    Компилирует шаблоны из DIRS каждого движка Django-шаблонов.
+
+    Возвращает число скомпилированных шаблонов; TemplateSyntaxError
+    пробрасывается.
+    """
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            for name in iter_template_names(directory):
+                engine.get_template(name)
+                compiled += 1
+    return compiled
@@ -22,12 +22,12 @@ then
     if python structure_test.py
     then
         cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
+        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings.dev"}"
         if pytest --tb=line 1>&2;
         then
             cd ../ya_note
             unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
+            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings.dev"}"
             if pytest --tb=line 1>&2;
             then
                 exit 0
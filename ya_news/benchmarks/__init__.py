@@ -0,0 +1,37 @@
+"""
+Бенчмарки проекта YaNews.
+
+Запускаются из каталога ya_news как модули:
+
+    python -m benchmarks.comment_fragments
+    python -m benchmarks.detail_dispatch
+    python -m benchmarks.load
+    python -m benchmarks.search
+    python -m benchmarks.asgi
+    python -m benchmarks.concurrency
+    python -m benchmarks.auth_cache
+    python -m benchmarks.templates
+    python -m benchmarks.conditional
+"""
+import os
+import sys
+from pathlib import Path
+
+# Пакет common с кодом, общим для ya_news и ya_note, лежит в корне
+# репозитория, на уровень выше проекта.
+REPO_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
+
+from common.benchmarks import (  # noqa: E402, F401
+    load_results, measure, percentile, print_results, report, run_load,
+    save_results, session_cookie, test_database, wsgi_request
+)
+
+PROJECT = 'yanews'
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'{PROJECT}.settings.dev')
+    import django
+    django.setup()
@@ -0,0 +1,154 @@
+"""
+Сравнение синхронных и асинхронных страниц новостей под ASGI.
+
+Заполняет временную базу, затем для главной и страницы популярной
+новости выполняет запросы через ASGI-приложение с concurrency
+одновременными запросами — сначала с синхронными представлениями,
+потом с асинхронными (NEWS_ASYNC_VIEWS) — и для сравнения через
+WSGI-приложение в столько же потоков:
+
+    python -m benchmarks.asgi --concurrency 16 --requests 400
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import tempfile
+import time
+
+from benchmarks import (percentile, print_results, run_load, session_cookie,
+                        setup_django, test_database)
+from benchmarks.load import seed
+
+
+async def asgi_request(application, path, cookie=''):
+    """Выполняет GET-запрос через ASGI-приложение и возвращает код ответа."""
+    path, _, query = path.partition('?')
+    headers = [(b'host', b'testserver')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'headers': headers,
+        'server': ('testserver', 80),
+    }
+    messages = iter([{'type': 'http.request', 'body': b''}])
+    status = []
+
+    async def receive():
+        # После тела запроса клиент «молчит», пока ответ не отправлен.
+        return next(messages, {'type': 'http.disconnect'})
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+async def _asgi_load(application, path, cookie, requests, concurrency):
+    timings, statuses = [], set()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            statuses.add(await asgi_request(application, path, cookie))
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return timings, sorted(statuses), time.perf_counter() - start
+
+
+def run_asgi_load(application, routes, requests, concurrency):
+    """Как run_load, но с concurrency одновременными ASGI-запросами."""
+    results = {}
+    for name, (path, cookie) in routes.items():
+        timings, statuses, elapsed = asyncio.run(_asgi_load(
+            application, path, cookie, requests, concurrency
+        ))
+        results[name] = {
+            'path': path,
+            'requests': len(timings),
+            'statuses': statuses,
+            'p50_ms': percentile(timings, 50) * 1000,
+            'p95_ms': percentile(timings, 95) * 1000,
+            'p99_ms': percentile(timings, 99) * 1000,
+            'rps': len(timings) / elapsed,
+            # SQL выполняется в общем потоке sync_to_async — не считаем.
+            'queries_per_request': 0.0,
+        }
+    return results
+
+
+def use_async_views(enabled):
+    """Переключает NEWS_ASYNC_VIEWS и перечитывает маршруты."""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.NEWS_ASYNC_VIEWS = enabled
+    import news.urls
+    import yanews.urls
+    importlib.reload(news.urls)
+    importlib.reload(yanews.urls)
+    clear_url_caches()
+
+
+def build_routes():
+    from django.urls import reverse
+
+    from news.models import News
+
+    popular = News.objects.order_by('-comment_count').first()
+    cookie = session_cookie(popular.comment_set.first().author)
+    return {
+        'news:home': (reverse('news:home'), cookie),
+        'news:detail': (reverse('news:detail', args=(popular.pk,)), cookie),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    args = parser.parse_args()
+    setup_django()
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, 'bench.sqlite3')):
+            seed(args.users, args.news, args.comments)
+            routes = build_routes()
+            for title, async_views in (('ASGI, sync', False),
+                                       ('ASGI, async', True)):
+                use_async_views(async_views)
+                print(f'--- {title}')
+                print_results(run_asgi_load(
+                    get_asgi_application(), routes,
+                    args.requests, args.concurrency
+                ))
+            use_async_views(False)
+            print(f'--- WSGI, {args.concurrency} потоков')
+            print_results(run_load(
+                get_wsgi_application(), routes,
+                args.requests, args.concurrency
+            ))
+
+
+if __name__ == '__main__':
+    main()
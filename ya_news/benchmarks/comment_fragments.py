@@ -0,0 +1,82 @@
+"""
+Время отрисовки news/detail.html для авторизованного пользователя
+без кеширования фрагментов комментариев и с тёплым кешем.
+
+    python -m benchmarks.comment_fragments --sizes 1000 10000
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks import measure, report, setup_django
+
+
+def build_context(size):
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+    from django.utils import timezone
+
+    from news.forms import CommentForm
+    from news.models import Comment, News
+
+    User = get_user_model()
+    reader = User(pk=1, username='Читатель')
+    other = User(pk=2, username='Автор')
+    now = timezone.now()
+    news = News(pk=1, title='Заголовок', text='Текст новости')
+    comments = [
+        Comment(
+            pk=index,
+            news=news,
+            author=reader if index % 10 == 0 else other,
+            text=f'Комментарий {index}\nвторая строка',
+            created=now + timedelta(seconds=index),
+            updated=now + timedelta(seconds=index),
+        )
+        for index in range(1, size + 1)
+    ]
+    request = RequestFactory().get('/news/1/')
+    request.user = reader
+    return request, {
+        'news': news,
+        'object': news,
+        'comments': comments,
+        'form': CommentForm(),
+        'comment_cache_timeout': 600,
+    }
+
+
+def run(sizes, repeat):
+    from django.core.cache import caches
+    from django.template.loader import render_to_string
+    from django.test import override_settings
+
+    dummy_cache = {
+        alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        for alias in ('default', 'template_fragments')
+    }
+    for size in sizes:
+        request, context = build_context(size)
+
+        def render():
+            render_to_string('news/detail.html', context, request=request)
+
+        with override_settings(CACHES=dummy_cache):
+            report(f'{size} комментариев, без кеша', measure(render, repeat))
+        caches['template_fragments'].clear()
+        report(f'{size} комментариев, холодный кеш', measure(render, 1))
+        report(f'{size} комментариев, тёплый кеш', measure(render, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=(1000, 10000)
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
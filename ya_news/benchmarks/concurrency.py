@@ -0,0 +1,163 @@
+"""
+Запись комментариев при одновременном чтении страниц новостей.
+
+В файловой базе несколько потоков-писателей добавляют комментарии
+(вставка и увеличение счётчика в одной транзакции, как в NewsComment),
+а потоки-читатели выбирают страницу новости с комментариями. Прогон
+повторяется с обычными настройками SQLite и с базами из
+yanews.settings.prod: WAL, PRAGMA и чтения через реплику.
+
+    python -m benchmarks.concurrency --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks import setup_django, test_database
+
+INSERT_COMMENT = (
+    'INSERT INTO news_comment (news_id, author_id, text, created, updated) '
+    'VALUES (%s, %s, %s, %s, %s)'
+)
+UPDATE_COUNT = (
+    'UPDATE news_news SET comment_count = comment_count + 1 WHERE id = %s'
+)
+SELECT_PAGE = (
+    'SELECT id, text, created FROM news_comment WHERE news_id = %s '
+    'ORDER BY created, id LIMIT 50'
+)
+
+
+def profiles(name):
+    """Настройки псевдонимов default и replica для обоих прогонов."""
+    from django.conf import settings
+
+    baseline = {
+        'ENGINE': 'common.sqlite',
+        'NAME': name,
+        # Режим журнала сохраняется в файле — возвращаем исходный.
+        'OPTIONS': {'pragmas': {'journal_mode': 'DELETE'}},
+    }
+    performance = {
+        'ENGINE': 'common.sqlite',
+        'NAME': name,
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'pragmas': settings.SQLITE_PERFORMANCE_PRAGMAS},
+    }
+    replica = {
+        **performance,
+        'OPTIONS': {
+            'pragmas': settings.SQLITE_REPLICA_PRAGMAS,
+            'read_only': True,
+        },
+    }
+    return {
+        'обычный SQLite': {'default': baseline, 'replica': baseline},
+        'профиль производительности': {
+            'default': performance, 'replica': replica,
+        },
+    }
+
+
+def _worker(connection, stop, counter, action):
+    try:
+        while not stop.is_set():
+            try:
+                action(connection)
+                counter['ok'] += 1
+            except Exception as error:
+                counter[type(error).__name__] += 1
+    finally:
+        connection.close()
+
+
+def run_profile(databases, news_id, author_id, writers, readers, seconds):
+    from django.db.utils import ConnectionHandler
+    from django.utils import timezone
+
+    handler = ConnectionHandler(databases)
+    writes, reads = Counter(), Counter()
+    stop = threading.Event()
+
+    def write(connection):
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute(
+                    INSERT_COMMENT, [news_id, author_id, 'Текст', now, now]
+                )
+                cursor.execute(UPDATE_COUNT, [news_id])
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+
+    def read(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(SELECT_PAGE, [news_id])
+            cursor.fetchall()
+
+    threads = [
+        threading.Thread(target=lambda: _worker(
+            handler['default'], stop, writes, write
+        )) for _ in range(writers)
+    ] + [
+        threading.Thread(target=lambda: _worker(
+            handler['replica'], stop, reads, read
+        )) for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return writes, reads
+
+
+def print_profile(title, writes, reads, seconds):
+    errors = {
+        name: count for name, count in (writes + reads).items()
+        if name != 'ok'
+    }
+    print(
+        f'{title:<28} запись {writes["ok"] / seconds:8.1f}/с  '
+        f'чтение {reads["ok"] / seconds:9.1f}/с  ошибки {errors or "нет"}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+    setup_django()
+    with tempfile.TemporaryDirectory() as directory:
+        name = os.path.join(directory, 'bench.sqlite3')
+        with test_database(name):
+            from django.contrib.auth import get_user_model
+            from django.db import connection
+
+            from news.models import News
+
+            news = News.objects.create(title='Новость', text='Текст')
+            author = get_user_model().objects.create(username='Автор')
+            # Прогоны открывают базу своими соединениями.
+            connection.close()
+            for title, databases in profiles(name).items():
+                writes, reads = run_profile(
+                    databases, news.pk, author.pk,
+                    args.writers, args.readers, args.seconds
+                )
+                print_profile(title, writes, reads, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Условные GET-запросы: полный ответ против 304.
+
+Анонимный клиент запрашивает главную и страницу новости с 50
+комментариями без валидаторов и с If-None-Match. Кеш страниц
+очищается перед каждым запросом, как при промахе, — так видна работа
+самого представления. Печатает время и размер ответа:
+
+    python -m benchmarks.conditional --repeat 200
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, test_database
+
+
+def run_page(title, url, repeat):
+    from django.core.cache import caches
+    from django.test import Client
+
+    client = Client()
+    etag = client.get(url)['ETag']
+
+    def request(**headers):
+        def get():
+            caches['default'].clear()
+            return client.get(url, **headers)
+        return get
+
+    for label, headers in (
+        ('200', {}),
+        ('304', {'HTTP_IF_NONE_MATCH': etag}),
+    ):
+        size = len(request(**headers)().content)
+        report(
+            f'{title}: {label}, {size} байт',
+            measure(request(**headers), repeat)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+
+        from news.models import Comment, News
+
+        author = get_user_model().objects.create(username='Автор')
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Текст новости. ' * 20)
+            for index in range(20)
+        )
+        news = News.objects.first()
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(50)
+        )
+        News.objects.recount_comments()
+        run_page('news:home', reverse('news:home'), args.repeat)
+        run_page(
+            'news:detail',
+            reverse('news:detail', args=(news.pk,)),
+            args.repeat
+        )
+
+
+if __name__ == '__main__':
+    main()
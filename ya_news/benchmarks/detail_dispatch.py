@@ -0,0 +1,78 @@
+"""
+Горячий путь страницы новости: диспетчеризация GET/POST и отправка
+комментария с редиректом.
+
+Сравнивает создание функции представления на каждый запрос с готовой
+функцией и замеряет полный цикл POST → редирект с числом SQL-запросов:
+
+    python -m benchmarks.detail_dispatch --repeat 20
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, test_database
+
+
+DISPATCH_BATCH = 1000
+
+
+def run_dispatch(repeat):
+    """Время получения функций представлений на DISPATCH_BATCH запросов."""
+    from news.views import NewsComment, NewsDetail, NewsDetailView
+
+    def rebuild():
+        for _ in range(DISPATCH_BATCH):
+            NewsDetail.as_view()
+            NewsComment.as_view()
+
+    def reuse():
+        for _ in range(DISPATCH_BATCH):
+            NewsDetailView.detail_view
+            NewsDetailView.comment_view
+
+    report(f'as_view(), {DISPATCH_BATCH} запросов', measure(rebuild, repeat))
+    report(
+        f'готовые функции, {DISPATCH_BATCH} запросов', measure(reuse, repeat)
+    )
+
+
+def run_comment_post(repeat):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from news.models import News
+
+    author = get_user_model().objects.create(username='Автор')
+    news = News.objects.create(title='Заголовок', text='Текст')
+    client = Client()
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+
+    def post():
+        response = client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 302, response.status_code
+
+    with CaptureQueriesContext(connection) as queries:
+        post()
+    report(
+        f'POST комментария ({len(queries)} SQL)', measure(post, repeat)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    run_dispatch(args.repeat)
+    with test_database():
+        run_comment_post(args.posts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Нагрузочный бенчмарк всех маршрутов news/urls.py.
+
+Заполняет временную базу синтетическими данными, прогоняет GET-запросы
+через WSGI-приложение в несколько потоков и сохраняет результат в JSON:
+
+    python -m benchmarks.load --news 1000 --workers 8 --output before.json
+    python -m benchmarks.load ... --output after.json --compare before.json
+"""
+import argparse
+import os
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks import (PROJECT, load_results, print_results, run_load,
+                        save_results, session_cookie, setup_django,
+                        test_database)
+
+
+def seed(users, news, comments):
+    from django.contrib.auth import get_user_model
+
+    from news import search
+    from news.models import Comment, News
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'Пользователь {index}') for index in range(users)
+    )
+    News.objects.bulk_create(
+        (News(title=f'Новость {index}', text='Текст новости. ' * 20)
+         for index in range(news)),
+        batch_size=500
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    # Половина комментариев достаётся одной «вирусной» новости.
+    Comment.objects.bulk_create(
+        (Comment(
+            news_id=news_ids[0] if index % 2 else news_ids[index % news],
+            author_id=user_ids[index % users],
+            text=f'Комментарий {index}',
+        ) for index in range(comments)),
+        batch_size=500
+    )
+    News.objects.recount_comments()
+    # bulk_create не отправляет сигналы, индекс поиска строится отдельно.
+    search.rebuild_index(News.objects.all())
+
+
+def build_routes():
+    """Маршруты приложения news с анонимным и авторизованным клиентом."""
+    from django.urls import reverse
+    from django.utils.http import urlencode
+
+    from news.models import Comment, News
+
+    popular = News.objects.order_by('-comment_count').first()
+    comment = Comment.objects.select_related('author').first()
+    cookie = session_cookie(comment.author)
+    search_url = f"{reverse('news:search')}?{urlencode({'q': 'новость'})}"
+    return {
+        'news:home (аноним)': (reverse('news:home'), ''),
+        'news:home': (reverse('news:home'), cookie),
+        'news:detail (аноним)': (
+            reverse('news:detail', args=(popular.pk,)), ''
+        ),
+        'news:detail': (reverse('news:detail', args=(popular.pk,)), cookie),
+        'news:edit': (reverse('news:edit', args=(comment.pk,)), cookie),
+        'news:delete': (reverse('news:delete', args=(comment.pk,)), cookie),
+        'news:search (аноним)': (search_url, ''),
+        'news:search': (search_url, cookie),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--output', default='load-results.json')
+    parser.add_argument('--compare', help='JSON предыдущего прогона.')
+    args = parser.parse_args()
+    setup_django()
+    from django.core.wsgi import get_wsgi_application
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, 'bench.sqlite3')):
+            seed(args.users, args.news, args.comments)
+            routes = build_routes()
+            results = run_load(
+                get_wsgi_application(), routes, args.requests, args.workers
+            )
+    print_results(
+        results, load_results(args.compare) if args.compare else None
+    )
+    save_results(args.output, {
+        'project': PROJECT,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'scale': {
+            'users': args.users,
+            'news': args.news,
+            'comments': args.comments,
+        },
+        'workers': args.workers,
+        'routes': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
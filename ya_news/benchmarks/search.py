@@ -0,0 +1,67 @@
+"""
+Время поиска по новостям в зависимости от размера архива.
+
+    python -m benchmarks.search --sizes 10000 100000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django, test_database
+
+WORDS = (
+    'погода', 'спорт', 'экономика', 'выборы', 'технологии', 'культура',
+    'наука', 'космос', 'медицина', 'образование', 'транспорт', 'город',
+)
+
+
+def seed(size):
+    from news import search
+    from news.models import News
+
+    rng = random.Random(size)
+    News.objects.all().delete()
+    News.objects.bulk_create(
+        (News(
+            title=' '.join(rng.choices(WORDS, k=3)),
+            text=' '.join(rng.choices(WORDS, k=60)) + f' выпуск{index}',
+        ) for index in range(size)),
+        batch_size=1000
+    )
+    search.rebuild_index(News.objects.all())
+
+
+def run(sizes, repeat):
+    from news.search import search_ids
+
+    for size in sizes:
+        seed(size)
+        queries = {
+            'частое слово': 'погода',
+            'два слова': 'погода и спорт',
+            'редкое слово': f'выпуск{size // 2}',
+        }
+        for title, query in queries.items():
+            report(
+                f'{size} новостей, {title}',
+                measure(lambda: search_ids(query), repeat)
+            )
+        report(
+            f'{size} новостей, 10-я страница',
+            measure(lambda: search_ids('погода', offset=90), repeat)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=(10000, 100000)
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Загрузка шаблонов: чтение с диска, кеширующий загрузчик и прогрев.
+
+Для каждого варианта настроек TEMPLATES движок шаблонов создаётся
+заново repeat раз; замеряются первый запрос страницы новости после
+создания движка и установившееся время последующих запросов:
+
+    python -m benchmarks.templates --repeat 20 --requests 200
+"""
+import argparse
+import statistics
+
+from benchmarks import measure, report, setup_django, test_database
+
+DISK_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+CACHED_LOADERS = [('django.template.loaders.cached.Loader', DISK_LOADERS)]
+
+
+def template_settings(loaders):
+    from django.conf import settings
+
+    engine = settings.TEMPLATES[0]
+    return [{
+        **engine,
+        'APP_DIRS': False,
+        'OPTIONS': {**engine['OPTIONS'], 'loaders': loaders},
+    }]
+
+
+def run_profile(title, url, user, repeat, requests, loaders, warm_up):
+    from django.test import Client, override_settings
+
+    from common.warmup import warm_up_templates
+
+    first, steady, warm_ups = [], [], []
+    for _ in range(repeat):
+        # Изменение TEMPLATES сбрасывает движки вместе с их кешем.
+        with override_settings(TEMPLATES=template_settings(loaders)):
+            if warm_up:
+                warm_ups += measure(warm_up_templates, 1)
+            client = Client()
+            client.force_login(user)
+
+            def get():
+                response = client.get(url)
+                assert response.status_code == 200, response.status_code
+
+            first += measure(get, 1)
+            steady.append(statistics.median(measure(get, requests)))
+    if warm_ups:
+        report(f'{title}: прогрев', warm_ups)
+    report(f'{title}: первый запрос', first)
+    report(f'{title}: дальше', steady)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+
+        from news.models import Comment, News
+
+        user = get_user_model().objects.create(username='Читатель')
+        news = News.objects.create(title='Заголовок', text='Текст')
+        Comment.objects.create(news=news, author=user, text='Комментарий')
+        url = reverse('news:detail', args=(news.pk,))
+        profiles = (
+            ('с диска', DISK_LOADERS, False),
+            ('кеш', CACHED_LOADERS, False),
+            ('кеш и прогрев', CACHED_LOADERS, True),
+        )
+        for title, loaders, warm_up in profiles:
+            run_profile(
+                title, url, user, args.repeat, args.requests,
+                loaders, warm_up
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,18 @@
 """Django's command-line utility for administrative tasks."""
 import os
 import sys
+from pathlib import Path
+
+# Пакет common с кодом, общим для ya_news и ya_note, лежит в корне
+# репозитория, на уровень выше проекта.
+REPO_DIR = str(Path(__file__).resolve().parent.parent)
 
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    if REPO_DIR not in sys.path:
+        sys.path.append(REPO_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings.dev')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
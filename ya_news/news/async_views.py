@@ -0,0 +1,74 @@
+"""
+Асинхронные варианты страниц новостей для запуска под ASGI.
+
+В Django 3.2 у ORM нет асинхронного API, поэтому вся работа с базой
+делается за один переход в sync_to_async на запрос: там загружается
+пользователь и вычисляются все querysets. Шаблон затем отрисовывается
+прямо в цикле событий, без обращений к базе и без занятого потока.
+Кеш страниц для анонимных пользователей и ответы 304 на условные
+запросы остаются за синхронными представлениями.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import render
+
+from .routers import read_from_replica
+from .views import NewsComment, NewsDetail, NewsList
+
+
+def _setup_view(view_class, request, **kwargs):
+    # Пользователь загружается здесь, пока мы ещё в синхронном потоке.
+    request.user.is_authenticated
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+@sync_to_async
+def _news_list_context(request):
+    view = _setup_view(NewsList, request)
+    with read_from_replica():
+        view.object_list = view.get_queryset()
+        return view.get_context_data()
+
+
+@sync_to_async
+def _news_detail_context(request, pk):
+    view = _setup_view(NewsDetail, request, pk=pk)
+    with read_from_replica():
+        view.object = view.get_object()
+        return view.get_context_data(object=view.object)
+
+
+@sync_to_async
+def _post_comment(request, pk):
+    """Возвращает редирект либо контекст страницы с ошибками формы."""
+    view = _setup_view(NewsComment, request, pk=pk)
+    if not request.user.is_authenticated:
+        return view.handle_no_permission(), None
+    view.object = view.get_object()
+    form = view.get_form()
+    if form.is_valid():
+        return view.form_valid(form), None
+    return None, view.get_context_data(form=form)
+
+
+async def news_list(request):
+    """Асинхронный вариант NewsList."""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+    context = await _news_list_context(request)
+    return render(request, NewsList.template_name, context)
+
+
+async def news_detail(request, pk):
+    """Асинхронный вариант NewsDetailView: страница новости и комментарий."""
+    if request.method == 'POST':
+        response, context = await _post_comment(request, pk)
+        if response is not None:
+            return response
+    elif request.method in ('GET', 'HEAD'):
+        context = await _news_detail_context(request, pk)
+    else:
+        return HttpResponseNotAllowed(('GET', 'HEAD', 'POST'))
+    return render(request, NewsDetail.template_name, context)
@@ -0,0 +1,150 @@
+"""
+Кеш целых страниц для анонимных читателей.
+
+Страница хранится под ключом, в который входит версия её «области»:
+главной или конкретной новости. При изменении новостей и комментариев
+сигналы выдают области новую версию, и старые записи перестают
+находиться — их не нужно перечислять и удалять по одной. В ключ входят
+только путь и параметры запроса, от которых страница зависит; запросы
+с посторонними параметрами не кешируются.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, urlencode
+
+HOME_SCOPE = 'home'
+# Общая версия всех страниц: сбрасывается после массовой загрузки данных.
+ALL_SCOPE = 'all'
+
+
+def detail_scope(news_id):
+    return f'detail:{news_id}'
+
+
+def get_page_cache():
+    return caches[settings.NEWS_PAGE_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'news-page-version:{scope}'
+
+
+def get_scope_version(scope):
+    cache = get_page_cache()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() не перетирает версию, выданную параллельным запросом.
+        if not cache.add(_version_key(scope), version, None):
+            version = cache.get(_version_key(scope), version)
+    return version
+
+
+def invalidate_scopes(*scopes):
+    """Делает устаревшими все закешированные страницы областей."""
+    get_page_cache().set_many(
+        {_version_key(scope): uuid.uuid4().hex for scope in scopes}, None
+    )
+
+
+def invalidate_on_commit(*scopes):
+    """
+    Сбрасываем кеш после фиксации транзакции, иначе параллельный запрос
+    успеет закешировать ещё не обновлённую страницу под новой версией.
+    """
+    transaction.on_commit(lambda: invalidate_scopes(*scopes))
+
+
+def page_cache_key(scope, request, params=()):
+    """
+    Ключ страницы: версии областей, путь и значения параметров params.
+
+    Остальные параметры запроса в ключ не входят.
+    """
+    query = urlencode(sorted(
+        (name, request.GET[name]) for name in params if name in request.GET
+    ))
+    path = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return (
+        f'news-page-v3:{get_scope_version(ALL_SCOPE)}:'
+        f'{scope}:{get_scope_version(scope)}:{path}'
+    )
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдаёт анонимным пользователям готовую страницу из кеша.
+
+    Подходит только для страниц, которые у всех анонимных пользователей
+    одинаковы: без CSRF-токена и персональных данных. Авторизованным
+    страница по-прежнему строится на каждый запрос.
+
+    Область кеша задаётся атрибутом page_cache_scope или методом
+    get_page_cache_scope(), параметры запроса, от которых зависит
+    страница, — атрибутом page_cache_params. Заголовки ответа, в том
+    числе ETag и Last-Modified, сохраняются вместе со страницей;
+    валидаторы проверяются на каждом попадании в кеш. Ответы,
+    устанавливающие cookie, не кешируются.
+    """
+    page_cache_scope = None
+    page_cache_params = ()
+
+    def get_page_cache_scope(self):
+        if self.page_cache_scope is None:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} должен задать page_cache_scope '
+                'или переопределить get_page_cache_scope().'
+            )
+        return self.page_cache_scope
+
+    def is_page_cacheable(self, request):
+        """Кешируются GET и HEAD анонимов без посторонних параметров."""
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            and all(
+                name in self.page_cache_params
+                and len(request.GET.getlist(name)) == 1
+                for name in request.GET
+            )
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_page_cache()
+        key = page_cache_key(
+            self.get_page_cache_scope(), request, self.page_cache_params
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return self.cached_response(request, *cached)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            if hasattr(response, 'render'):
+                response.render()
+            cache.set(
+                key,
+                (response.content, dict(response.items())),
+                settings.NEWS_PAGE_CACHE_TIMEOUT
+            )
+        return response
+
+    @staticmethod
+    def cached_response(request, content, headers):
+        response = HttpResponse(content)
+        for header, value in headers.items():
+            response[header] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response
+        )
@@ -0,0 +1,60 @@
+"""
+Условные GET-запросы к страницам новостей.
+
+ConditionalPageMixin отдаёт ETag и, если страница его знает,
+Last-Modified, а на повторный запрос
+с совпадающим If-None-Match или If-Modified-Since отвечает 304, не
+отрисовывая шаблон. Валидаторы вычисляются по тем же строкам, которые
+страница потом выводит, поэтому полный ответ не требует лишних запросов
+к базе.
+"""
+import hashlib
+
+from django.core.exceptions import ImproperlyConfigured
+from django.views.decorators.http import condition
+
+
+class ConditionalPageMixin:
+    """
+    Проверяет условные заголовки GET- и HEAD-запросов.
+
+    Подкласс обязан вернуть из get_validator_values значения, от которых
+    зависит страница. get_last_modified по умолчанию возвращает None,
+    и Last-Modified не отдаётся: переопределять его стоит, только если
+    время последнего изменения меняется при любом изменении страницы.
+    """
+
+    def get_validator_values(self):
+        raise ImproperlyConfigured(
+            f'{type(self).__name__} должен переопределить '
+            'get_validator_values().'
+        )
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag(self):
+        values = list(self.get_validator_values())
+        if self.request.user.is_authenticated:
+            # В странице есть имя пользователя и CSRF-токен; ключ сессии
+            # меняется при каждом входе.
+            values += [self.request.user.pk, self.request.session.session_key]
+        return hashlib.md5(repr(values).encode()).hexdigest()
+
+    def get_last_modified_for_user(self):
+        # Last-Modified не различает пользователей, поэтому только анонимам.
+        if self.request.user.is_authenticated:
+            return None
+        return self.get_last_modified()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        view = condition(
+            etag_func=lambda request, *args, **kwargs: self.get_etag(),
+            last_modified_func=(
+                lambda request, *args, **kwargs:
+                self.get_last_modified_for_user()
+            ),
+        )(super().dispatch)
+        return view(request, *args, **kwargs)
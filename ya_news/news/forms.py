@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .moderation import BadWordsFilter
 
 BAD_WORDS = (
     'редиска',
@@ -10,6 +12,14 @@ BAD_WORDS = (
 )
 WARNING = 'Не ругайтесь!'
 
+# Строится один раз при запуске; слова из BAD_WORDS_FILE подхватываются
+# заново при изменении файла, проверяемом раз в BAD_WORDS_CHECK_INTERVAL.
+bad_words_filter = BadWordsFilter(
+    BAD_WORDS,
+    settings.BAD_WORDS_FILE,
+    check_interval=settings.BAD_WORDS_CHECK_INTERVAL,
+)
+
 
 class CommentForm(ModelForm):
 
@@ -20,8 +30,9 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        word = bad_words_filter.find(text)
+        if word is not None:
+            raise ValidationError(
+                WARNING, code='bad_word', params={'word': word}
+            )
         return text
@@ -0,0 +1,22 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from news.services import dump_fixture
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает новости и комментарии в формате news.json.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output', help='Путь к файлу; по умолчанию stdout.'
+        )
+        parser.add_argument('--indent', type=int)
+
+    def handle(self, *args, **options):
+        if options['output'] is None:
+            dump_fixture(sys.stdout, indent=options['indent'])
+            return
+        with open(options['output'], 'w', encoding='utf-8') as stream:
+            dump_fixture(stream, indent=options['indent'])
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from news.services import (COMMENT_IMPORT_BATCH_SIZE, import_comments,
+                           read_rows)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает комментарии из CSV или JSON Lines '
+        '(поля news, author, text, created).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=COMMENT_IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            report = self._import(sys.stdin, options)
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                report = self._import(stream, options)
+        for number, reason in report.rejected:
+            self.stderr.write(f'Строка {number}: {reason}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {report.created}, отклонено: {len(report.rejected)}, '
+            f'{report.elapsed:.2f} с ({report.rate:.0f} в секунду)'
+        ))
+
+    def _import(self, stream, options):
+        return import_comments(
+            read_rows(stream, options['format']),
+            batch_size=options['batch_size'],
+            numbered=True,
+        )
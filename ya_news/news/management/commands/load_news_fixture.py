@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from news.services import FIXTURE_BATCH_SIZE, load_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает фикстуру новостей и комментариев '
+        'в формате news.json.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--batch-size', type=int, default=FIXTURE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8') as stream:
+            loaded = load_fixture(stream, batch_size=options['batch_size'])
+        for label, count in loaded.items():
+            self.stdout.write(self.style.SUCCESS(f'{label}: {count}'))
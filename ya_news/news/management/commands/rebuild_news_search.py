@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news import search
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=search.INDEX_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.create_index()
+            indexed = search.rebuild_index(
+                News.objects.all(), options['batch_size']
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано новостей: {indexed}')
+        )
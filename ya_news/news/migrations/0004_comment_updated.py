@@ -0,0 +1,24 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+
+def fill_updated(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    Comment.objects.update(updated=models.F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(fill_updated, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from common.textsearch import analyze
+
+# SQL заморожен на момент миграции: news.search может меняться дальше.
+CREATE_TABLE_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_search '
+    "USING fts5(title, text, tokenize='unicode61 remove_diacritics 2')"
+)
+INSERT_SQL = (
+    'INSERT OR REPLACE INTO news_search (rowid, title, text) '
+    'VALUES (%s, %s, %s)'
+)
+DROP_TABLE_SQL = 'DROP TABLE IF EXISTS news_search'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    News = apps.get_model('news', 'News')
+    rows = News.objects.using(connection.alias).values_list(
+        'pk', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.executemany(INSERT_SQL, [
+            (pk, ' '.join(analyze(title)), ' '.join(analyze(text)))
+            for pk, title, text in rows.iterator()
+        ])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_news_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'updated'], name='comment_news_updated_idx'),
+        ),
+    ]
@@ -2,15 +2,46 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        """
+        Пересчитывает счётчик комментариев одним UPDATE.
+
+        Как и любое изменение счётчика, сдвигает updated новостей.
+        """
+        comments = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.update(
+            comment_count=Coalesce(Subquery(comments), 0),
+            updated=timezone.now()
+        )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Сдвигается и при изменении счётчика комментариев: от него зависят
+    # ETag и Last-Modified страниц новостей.
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -28,10 +59,24 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Не auto_now_add: при импорте нужно сохранять исходное время.
+    created = models.DateTimeField(default=timezone.now, editable=False)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            # Страница новости: комментарии одной новости по времени.
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx'
+            ),
+            # Время последнего изменения комментариев новости для ETag.
+            models.Index(
+                fields=('news', 'updated'),
+                name='comment_news_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
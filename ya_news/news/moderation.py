@@ -0,0 +1,110 @@
+"""
+Поиск запрещённых слов в тексте комментариев.
+
+Все слова собираются в префиксное дерево, а дерево — в одно регулярное
+выражение. На каждой позиции текста движок проходит не больше одной ветки
+дерева, поэтому время проверки зависит от длины текста и длины самого
+длинного слова, но не от размера списка.
+"""
+import os
+import re
+import time
+
+WILDCARD = '*'
+# Как часто, в секундах, проверять, не изменился ли файл со словами.
+CHECK_INTERVAL = 5.0
+_END = ''
+
+
+def _build_trie(words):
+    trie = {}
+    for word in words:
+        wildcard = word.endswith(WILDCARD)
+        word = word.rstrip(WILDCARD)
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = node.get(_END, False) or wildcard
+    return trie
+
+
+def _trie_pattern(node):
+    if node.get(_END):
+        # «слово*» совпадает с любым продолжением слова.
+        return r'\w*'
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if not branches:
+        return ''
+    if _END in node:
+        # Слово уже найдено, но пробуем дочитать более длинное.
+        return '(?:{})?'.format('|'.join(branches))
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:{})'.format('|'.join(branches))
+
+
+def read_words_file(path):
+    """Читает по слову на строку, пропуская пустые строки и комментарии."""
+    with open(path, encoding='utf-8') as words_file:
+        return [
+            line.strip() for line in words_file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+class BadWordsFilter:
+    """
+    Фильтр запрещённых слов.
+
+    Слово, оканчивающееся на «*», задаёт основу: «негодя*» находит
+    «негодяй», «негодяя», «негодяями» и сообщает найденную словоформу.
+    Если передан путь к файлу, слова из него добавляются к списку words,
+    а при изменении файла фильтр перестраивается. Файл проверяется
+    не чаще раза в check_interval секунд; если он пропал или не читается,
+    фильтр продолжает работать с последним загруженным списком.
+    """
+
+    def __init__(self, words=(), path=None, check_interval=CHECK_INTERVAL):
+        self.base_words = tuple(words)
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = None
+        self.reload()
+        self._next_check = time.monotonic() + check_interval
+
+    def reload(self):
+        words = [word.lower() for word in self.base_words]
+        mtime = None
+        if self.path:
+            mtime = os.stat(self.path).st_mtime
+            words.extend(word.lower() for word in read_words_file(self.path))
+        pattern = _trie_pattern(_build_trie(words))
+        self.words = tuple(words)
+        self._regex = re.compile(pattern) if pattern else None
+        self._mtime = mtime
+
+    def _reload_if_changed(self):
+        if not self.path or time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            if os.stat(self.path).st_mtime != self._mtime:
+                self.reload()
+        except (OSError, ValueError):
+            # Файл удалён или испорчен: проверка комментариев не должна
+            # падать, поэтому остаётся прежний список.
+            pass
+
+    def find(self, text):
+        """Возвращает первое найденное запрещённое слово или None."""
+        self._reload_if_changed()
+        if self._regex is None:
+            return None
+        match = self._regex.search(text.lower())
+        return match.group() if match else None
@@ -0,0 +1,79 @@
+"""
+Постраничный вывод по ключу (keyset / seek pagination).
+
+Вместо OFFSET следующая страница начинается сразу после последней записи
+предыдущей: условие строится по полям сортировки, поэтому с подходящим
+индексом каждая страница выбирается за одно и то же время.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+from common.limits import fits_sql_integer
+
+
+def _field_names(ordering):
+    return [name.lstrip('-') for name in ordering]
+
+
+def encode_cursor(obj, ordering):
+    """Возвращает курсор, указывающий на запись obj."""
+    values = [
+        obj._meta.get_field(name).value_to_string(obj)
+        for name in _field_names(ordering)
+    ]
+    return base64.urlsafe_b64encode(
+        json.dumps(values).encode()
+    ).decode()
+
+
+def _check_value(value):
+    # None и целые вне 64 бит не годятся как параметры запроса.
+    if value is None:
+        raise ValueError
+    if isinstance(value, int) and not fits_sql_integer(value):
+        raise ValueError
+    return value
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    Разбирает курсор в значения полей сортировки.
+
+    На любой подделанный или испорченный курсор отвечает 404.
+    """
+    names = _field_names(ordering)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(names):
+            raise ValueError
+        return [
+            _check_value(model._meta.get_field(name).to_python(value))
+            for name, value in zip(names, values)
+        ]
+    except (ValueError, TypeError, ValidationError):
+        raise Http404('Некорректный курсор страницы.')
+
+
+def seek(queryset, ordering, cursor=None):
+    """
+    Упорядочивает queryset и отбрасывает записи до курсора включительно.
+
+    Для сортировки (a, b) условие имеет вид
+    a > a0 OR (a = a0 AND b > b0), с учётом направления каждого поля.
+    """
+    queryset = queryset.order_by(*ordering)
+    if not cursor:
+        return queryset
+    values = decode_cursor(cursor, queryset.model, ordering)
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return queryset.filter(condition)
@@ -1,5 +1,10 @@
+from contextlib import contextmanager
+
 import pytest
 from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test.client import Client
 from django.urls import reverse
 
@@ -86,6 +91,17 @@ def db_access(db):
     pass
 
 
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш не откатывается вместе с транзакцией теста — чистим вручную."""
+    _clear_caches()
+
+
 @pytest.fixture
 def home_url():
     return reverse('news:home')
@@ -106,6 +122,11 @@ def comment_delete_url(comment):
     return reverse('news:delete', args=(comment.id,))
 
 
+@pytest.fixture
+def search_url():
+    return reverse('news:search')
+
+
 @pytest.fixture
 def login_url():
     return reverse('users:login')
@@ -119,3 +140,60 @@ def logout_url():
 @pytest.fixture
 def signup_url():
     return reverse('users:signup')
+
+
+def _plan_problems(sql):
+    """Возвращает строки плана с полным просмотром таблицы или сортировкой."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        details = [row[-1] for row in cursor.fetchall()]
+    return [
+        detail for detail in details
+        if 'TEMP B-TREE' in detail
+        or (detail.startswith('SCAN') and 'INDEX' not in detail
+            and 'PRIMARY KEY' not in detail)
+    ]
+
+
+@pytest.fixture
+def assert_queries_use_indexes():
+    """
+    Выполняет EXPLAIN QUERY PLAN для каждого SELECT внутри блока
+    и падает, если SQLite просматривает таблицу целиком или строит
+    временное дерево для сортировки.
+    """
+    @contextmanager
+    def check():
+        with CaptureQueriesContext(connection) as context:
+            yield
+        problems = {}
+        for query in context.captured_queries:
+            if query['sql'].startswith('SELECT'):
+                details = _plan_problems(query['sql'])
+                if details:
+                    problems[query['sql']] = details
+        assert not problems, problems
+    return check
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    Проверяет, что страница укладывается в бюджет запросов к базе
+    и число запросов не растёт вместе с объёмом данных.
+
+    seed(size) доводит количество строк до size, make_request()
+    запрашивает страницу. Перед каждым замером кеши очищаются, чтобы
+    страница строилась заново.
+    """
+    def check(make_request, seed, budget, sizes=(1, 100, 10_000)):
+        counts = {}
+        for size in sizes:
+            seed(size)
+            _clear_caches()
+            with CaptureQueriesContext(connection) as context:
+                make_request()
+            counts[size] = len(context)
+        assert max(counts.values()) <= budget, counts
+        assert len(set(counts.values())) == 1, counts
+    return check
@@ -1,7 +1,31 @@
+import base64
+import json
+from http import HTTPStatus
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import Http404
 
+from news import async_views
 from news.forms import CommentForm
+from news.models import News
+
+HOME = pytest.lazy_fixture('home_url')
+NEWS_DETAIL = pytest.lazy_fixture('news_detail_url')
+# Курсоры, которые разбираются, но не годятся для запроса к базе.
+BROKEN_CURSORS = (
+    [None, 1],
+    ['2020-01-01', None],
+    ['2020-01-01', 10 ** 23],
+    ['2020-01-01', -2 ** 63 - 1],
+)
+
+
+def make_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
 
 
 def test_news_count(client, home_url, news_list):
@@ -21,6 +45,61 @@ def test_news_order(client, home_url, news_list):
     assert all_dates == sorted_dates
 
 
+def test_news_next_page(client, home_url, news_list):
+    """
+    Более ранние новости доступны по курсору и продолжают
+    первую страницу без пропусков и повторов.
+    """
+    first_page = client.get(home_url).context
+    second_page = client.get(
+        home_url, {'cursor': first_page['next_cursor']}
+    ).context
+    first_ids = [news.id for news in first_page['object_list']]
+    second_ids = [news.id for news in second_page['object_list']]
+    all_ids = list(
+        News.objects.order_by('-date', '-id').values_list('id', flat=True)
+    )
+    assert first_ids + second_ids == all_ids
+    assert 'next_cursor' not in second_page
+
+
+def test_news_invalid_cursor(client, home_url):
+    """Некорректный курсор приводит к ошибке 404."""
+    response = client.get(home_url, {'cursor': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('values', BROKEN_CURSORS)
+def test_news_cursor_with_unusable_values(client, home_url, values):
+    """Курсор с null или числом вне 64 бит приводит к ошибке 404."""
+    response = client.get(home_url, {'cursor': make_cursor(values)})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('values', BROKEN_CURSORS)
+def test_comments_cursor_with_unusable_values(
+        client, news_detail_url, values
+):
+    """Курсор комментариев с null или числом вне 64 бит — ошибка 404."""
+    response = client.get(news_detail_url, {'cursor': make_cursor(values)})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_home_queries_do_not_depend_on_comments(
+        client,
+        django_assert_num_queries,
+        home_url,
+        news_list,
+        comment_list
+):
+    """
+    Главная страница строится одним запросом
+    вне зависимости от числа комментариев.
+    """
+    with django_assert_num_queries(1):
+        client.get(home_url)
+
+
 def test_comments_order(client, news_detail_url, comment_list):
     """
     Комментарии на странице отдельной новости отсортированы
@@ -35,6 +114,40 @@ def test_comments_order(client, news_detail_url, comment_list):
     assert all_timestamps == sorted_timestamps
 
 
+def test_comments_next_page(client, settings, news_detail_url, comment_list):
+    """
+    Комментарии выводятся порциями, следующая порция
+    доступна по курсору и продолжает предыдущую.
+    """
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    pages = []
+    cursor = None
+    while True:
+        params = {'cursor': cursor} if cursor else {}
+        context = client.get(news_detail_url, params).context
+        assert len(context['comments']) <= 5
+        pages.extend(comment.id for comment in context['comments'])
+        cursor = context.get('next_cursor')
+        if cursor is None:
+            break
+    news = context['news']
+    assert pages == [comment.id for comment in news.comment_set.all()]
+
+
+def test_detail_queries_do_not_depend_on_comments(
+        client,
+        django_assert_num_queries,
+        news_detail_url,
+        comment_list
+):
+    """
+    Страница новости загружает новость и одну порцию комментариев
+    вместе с авторами — всего два запроса.
+    """
+    with django_assert_num_queries(2):
+        client.get(news_detail_url)
+
+
 @pytest.mark.parametrize(
     'parametrized_client, form_in_context',
     (
@@ -54,3 +167,244 @@ def test_comment_form_in_context(
     response = parametrized_client.get(news_detail_url)
     form = response.context.get('form')
     assert isinstance(form, CommentForm) is form_in_context
+
+
+@pytest.mark.parametrize('url', (HOME, NEWS_DETAIL))
+def test_anonymous_pages_are_cached(
+        client,
+        django_assert_num_queries,
+        url,
+        comment
+):
+    """Повторный запрос анонимного пользователя не обращается к базе."""
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content
+
+
+def test_authorized_pages_are_not_cached(author_client, news_detail_url):
+    """Авторизованному пользователю страница строится заново."""
+    author_client.get(news_detail_url)
+    response = author_client.get(news_detail_url)
+    assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.parametrize('url', (HOME, NEWS_DETAIL))
+def test_new_comment_invalidates_cached_pages(
+        client,
+        author_client,
+        django_capture_on_commit_callbacks,
+        news,
+        url,
+        news_detail_url
+):
+    """Новый комментарий сбрасывает кеш главной и страницы новости."""
+    client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(news_detail_url, data={'text': 'Свежий'})
+    response = client.get(url)
+    assert response.context is not None
+
+
+def test_edited_comment_fragment_is_refreshed(
+        author_client,
+        comment,
+        comment_edit_url,
+        news_detail_url
+):
+    """
+    Фрагмент комментария кешируется с учётом времени изменения,
+    поэтому после редактирования выводится новый текст.
+    """
+    author_client.get(news_detail_url)
+    author_client.post(comment_edit_url, data={'text': 'Исправленный'})
+    response = author_client.get(news_detail_url)
+    assert 'Исправленный' in response.content.decode()
+    assert comment.text not in response.content.decode()
+
+
+@pytest.mark.parametrize(
+    'url_name, with_cursor',
+    (
+        ('home_url', False),
+        ('home_url', True),
+        ('news_detail_url', False),
+        ('news_detail_url', True),
+        ('comment_edit_url', False),
+        ('comment_delete_url', False),
+    )
+)
+def test_view_queries_use_indexes(
+        request,
+        settings,
+        author_client,
+        assert_queries_use_indexes,
+        url_name,
+        with_cursor,
+        news_list,
+        comment_list,
+        comment
+):
+    """Запросы страниц не просматривают таблицы целиком и не сортируют."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    url = request.getfixturevalue(url_name)
+    params = {}
+    if with_cursor:
+        params['cursor'] = author_client.get(url).context['next_cursor']
+    with assert_queries_use_indexes():
+        author_client.get(url, params)
+
+
+def test_async_views_render_same_content(
+        client, rf, author, home_url, news_detail_url, news, comment
+):
+    """Асинхронные главная и страница новости совпадают с синхронными."""
+    home_request = rf.get(home_url)
+    home_request.user = AnonymousUser()
+    detail_request = rf.get(news_detail_url)
+    detail_request.user = author
+    home = async_to_sync(async_views.news_list)(home_request)
+    detail = async_to_sync(async_views.news_detail)(
+        detail_request, pk=news.pk
+    )
+    assert home.status_code == detail.status_code == HTTPStatus.OK
+    assert news.title in home.content.decode()
+    assert comment.text in detail.content.decode()
+    assert 'name="text"' in detail.content.decode()
+
+
+def test_async_news_detail_not_found(rf, news):
+    """Для несуществующей новости асинхронная страница отдаёт 404."""
+    request = rf.get('/')
+    request.user = AnonymousUser()
+    with pytest.raises(Http404):
+        async_to_sync(async_views.news_detail)(request, pk=news.pk + 1)
+
+
+def test_search_finds_word_forms(client, search_url, news):
+    """Поиск находит новость по другой форме слова."""
+    found = News.objects.create(
+        title='Новости спорта', text='Итоги спортивных соревнований'
+    )
+    response = client.get(search_url, {'q': 'новость о спорте'})
+    assert list(response.context['results']) == [found]
+
+
+def test_search_ranks_title_matches_first(client, search_url):
+    """Совпадение в заголовке важнее совпадения в тексте."""
+    in_text = News.objects.create(
+        title='Обзор недели', text='Главная тема недели — погода.'
+    )
+    in_title = News.objects.create(
+        title='Погода на выходные', text='Будет тепло и солнечно.'
+    )
+    response = client.get(search_url, {'q': 'погода'})
+    assert list(response.context['results']) == [in_title, in_text]
+
+
+def test_search_pages(client, settings, search_url):
+    """Результаты поиска разбиты на страницы без пропусков и повторов."""
+    settings.SEARCH_RESULTS_PER_PAGE = 2
+    for index in range(3):
+        News.objects.create(title=f'Выпуск {index}', text='Прогноз погоды')
+    first_page = client.get(search_url, {'q': 'прогноз'}).context
+    second_page = client.get(
+        search_url, {'q': 'прогноз', 'page': first_page['next_page']}
+    ).context
+    found = first_page['results'] + second_page['results']
+    assert len(first_page['results']) == 2
+    assert 'next_page' not in second_page
+    assert set(found) == set(News.objects.all())
+
+
+@pytest.mark.parametrize(
+    'page', ('0', 'abc', '1001', '1' * 30, str(2 ** 63))
+)
+def test_search_invalid_page(client, search_url, page):
+    """Номер страницы вне 1..MAX_PAGE приводит к ошибке 404."""
+    response = client.get(search_url, {'q': 'прогноз', 'page': page})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('url', (HOME, NEWS_DETAIL))
+@pytest.mark.parametrize('from_cache', (True, False))
+def test_conditional_get_returns_not_modified(
+        client,
+        url,
+        comment,
+        from_cache
+):
+    """
+    Повтор запроса с валидаторами получает 304 без тела, как из кеша
+    страниц, так и при построении страницы заново.
+    """
+    first = client.get(url)
+    validators = [{'HTTP_IF_NONE_MATCH': first['ETag']}]
+    if first.has_header('Last-Modified'):
+        validators.append(
+            {'HTTP_IF_MODIFIED_SINCE': first['Last-Modified']}
+        )
+    if not from_cache:
+        caches['default'].clear()
+    for headers in validators:
+        response = client.get(url, **headers)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.content == b''
+
+
+@pytest.mark.parametrize('url', (HOME, NEWS_DETAIL))
+def test_etag_changes_with_comments(
+        client,
+        author_client,
+        django_capture_on_commit_callbacks,
+        url,
+        news_detail_url,
+        comment,
+        comment_edit_url
+):
+    """Новый и отредактированный комментарий меняют ETag страниц."""
+    etags = [client.get(url)['ETag']]
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(news_detail_url, data={'text': 'Свежий'})
+    etags.append(client.get(url)['ETag'])
+    assert etags[1] != etags[0]
+    if url == news_detail_url:
+        with django_capture_on_commit_callbacks(execute=True):
+            author_client.post(comment_edit_url, data={'text': 'Правка'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[1])
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_home_etag_follows_page_membership(
+        client,
+        django_capture_on_commit_callbacks,
+        news_list,
+        home_url
+):
+    """
+    Удаление новости сдвигает на главную более старую, и ETag меняется;
+    Last-Modified главная не отдаёт, так как он бы не изменился.
+    """
+    first = client.get(home_url)
+    assert not first.has_header('Last-Modified')
+    with django_capture_on_commit_callbacks(execute=True):
+        News.objects.order_by('-date', '-id').first().delete()
+    response = client.get(home_url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_authorized_pages_have_own_etag(
+        client,
+        author_client,
+        news_detail_url
+):
+    """Авторизованному отдаётся свой ETag и не отдаётся Last-Modified."""
+    anonymous = client.get(news_detail_url)
+    response = author_client.get(news_detail_url)
+    assert response['ETag'] != anonymous['ETag']
+    assert not response.has_header('Last-Modified')
+    response = author_client.get(
+        news_detail_url, HTTP_IF_NONE_MATCH=anonymous['ETag']
+    )
+    assert response.status_code == HTTPStatus.OK
@@ -1,12 +1,46 @@
+import importlib
+import os
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.serializers.base import DeserializationError
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.template import TemplateSyntaxError, engines
+from django.test import RequestFactory
+from django.views import View
+from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from common.backends import (
+    CachedModelBackend, get_user_cache, user_cache_key
+)
+from common.warmup import warm_up_templates
 
+from news import async_views
+from news.cache import AnonymousPageCacheMixin
+from news.conditional import ConditionalPageMixin
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.models import Comment, News
+from news.moderation import BadWordsFilter
+from news.routers import ReadReplicaRouter, ReplicaReadMixin
+from news.search import search_ids
+from news.services import (
+    dump_fixture, import_comments, iter_json_array, load_fixture
+)
 
+
+NEWS_FIXTURE = Path(__file__).resolve().parent.parent / 'fixtures/news.json'
 BAD_WORDS_DATA = {'text': f'Какой-то текст, {BAD_WORDS[0]}, еще текст'}
 
 
@@ -106,3 +140,474 @@ def test_reader_cant_delete_comment(reader_client, comment_delete_url):
     response = reader_client.post(comment_delete_url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.count() == 1
+
+
+def test_comment_count_follows_create_and_delete(
+        author_client,
+        form_data,
+        news,
+        news_detail_url
+):
+    """Счётчик комментариев новости обновляется при создании и удалении."""
+    author_client.post(news_detail_url, data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_rebuild_comment_counts_command(news, comment_list):
+    """Команда rebuild_comment_counts восстанавливает счётчики."""
+    News.objects.update(comment_count=0)
+    call_command('rebuild_comment_counts', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(news=news).count()
+
+
+def test_bad_word_is_reported():
+    """Ошибка формы сообщает, какое именно слово запрещено."""
+    form = CommentForm(data=BAD_WORDS_DATA)
+    assert not form.is_valid()
+    error = form.errors.as_data()['text'][0]
+    assert error.messages == [WARNING]
+    assert error.params['word'] == BAD_WORDS[0]
+
+
+@pytest.mark.parametrize(
+    'text, expected_word',
+    (
+        ('Вы НЕГОДЯЯМИ стали', 'негодяями'),
+        ('Это редиска!', 'редиска'),
+        ('Это редис', None),
+        ('', None),
+    )
+)
+def test_bad_words_filter_finds_word_forms(text, expected_word):
+    """Основа со звёздочкой находит все формы слова."""
+    words_filter = BadWordsFilter(('редиска', 'негодя*'))
+    assert words_filter.find(text) == expected_word
+
+
+def test_bad_words_filter_reloads_file(tmp_path):
+    """Фильтр подхватывает изменения в файле со словами."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# Словарь модераторов\nбука\n', encoding='utf-8')
+    words_filter = BadWordsFilter(path=words_file, check_interval=0)
+    assert words_filter.find('Ты бука') == 'бука'
+    assert words_filter.find('Ты бяка') is None
+    words_file.write_text('бяка\n', encoding='utf-8')
+    os.utime(words_file, (0, 0))
+    assert words_filter.find('Ты бяка') == 'бяка'
+    assert words_filter.find('Ты бука') is None
+
+
+def test_bad_words_filter_survives_missing_file(tmp_path):
+    """Без файла со словами фильтр работает с последним списком."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('бука\n', encoding='utf-8')
+    words_filter = BadWordsFilter(path=words_file, check_interval=0)
+    words_file.unlink()
+    assert words_filter.find('Ты бука') == 'бука'
+
+
+def test_bad_words_filter_throttles_file_checks(tmp_path):
+    """Файл перечитывается не чаще раза в check_interval секунд."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('бука\n', encoding='utf-8')
+    words_filter = BadWordsFilter(path=words_file, check_interval=3600)
+    words_file.write_text('бяка\n', encoding='utf-8')
+    os.utime(words_file, (0, 0))
+    assert words_filter.find('Ты бяка') is None
+    assert words_filter.find('Ты бука') == 'бука'
+
+
+def test_import_comments(author, news):
+    """
+    Массовая загрузка создаёт корректные комментарии, отклоняет
+    остальные и обновляет счётчик новости.
+    """
+    rows = [
+        {'news': news.id, 'author': author.username, 'text': 'Первый',
+         'created': '2022-11-01T10:00:00'},
+        {'news': news.id, 'author': author.username, 'text': 'Второй'},
+        {'news': news.id, 'author': author.username, 'text': BAD_WORDS[0]},
+        {'news': news.id + 1, 'author': author.username, 'text': 'Мимо'},
+        {'news': news.id, 'author': 'Незнакомец', 'text': 'Мимо'},
+    ]
+    report = import_comments(rows, batch_size=2)
+    assert report.created == 2
+    assert [number for number, _ in report.rejected] == [3, 4, 5]
+    assert BAD_WORDS[0] in report.rejected[0][1]
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    first = Comment.objects.get(text='Первый')
+    assert (first.created.year, first.created.month) == (2022, 11)
+
+
+def test_import_comments_command(tmp_path, author, news):
+    """Команда import_comments читает CSV и сообщает итоги."""
+    csv_file = tmp_path / 'comments.csv'
+    csv_file.write_text(
+        'news,author,text\n'
+        f'{news.id},{author.username},Из старой системы\n',
+        encoding='utf-8'
+    )
+    out = StringIO()
+    call_command(
+        'import_comments', str(csv_file), '--format', 'csv', stdout=out
+    )
+    assert 'Загружено: 1' in out.getvalue()
+    assert Comment.objects.get().text == 'Из старой системы'
+
+
+@pytest.mark.parametrize(
+    'field, value, reason',
+    (
+        ('text', ['не', 'строка'], 'Текст должен быть строкой'),
+        ('created', 20221101, 'Некорректная дата'),
+        ('created', '2022-13-45T10:00:00', 'Некорректная дата'),
+        ('author', ['не', 'строка'], 'Автор не найден'),
+        ('news', {'id': 1}, 'Новость не найдена'),
+    )
+)
+def test_import_comments_rejects_bad_field_types(
+        author, news, field, value, reason
+):
+    """Поле не того типа отклоняет только свою строку."""
+    rows = [
+        {'news': news.id, 'author': author.username, 'text': 'Первый'},
+        {'news': news.id, 'author': author.username, 'text': 'Второй',
+         field: value},
+        {'news': news.id, 'author': author.username, 'text': 'Третий'},
+    ]
+    report = import_comments(rows)
+    assert report.created == 2
+    assert len(report.rejected) == 1
+    number, message = report.rejected[0]
+    assert number == 2
+    assert message.startswith(reason)
+
+
+def test_import_comments_command_skips_malformed_json(
+        tmp_path, author, news
+):
+    """Битая строка JSON Lines отклоняется со своим номером в файле."""
+    jsonl_file = tmp_path / 'comments.jsonl'
+    good = (
+        f'{{"news": {news.id}, "author": "{author.username}", '
+        '"text": "Целый"}\n'
+    )
+    jsonl_file.write_text(
+        good + '\n{"news": 1, "author": \n[1, 2]\n' + good,
+        encoding='utf-8'
+    )
+    out, err = StringIO(), StringIO()
+    call_command('import_comments', str(jsonl_file), stdout=out, stderr=err)
+    assert 'Загружено: 2, отклонено: 2' in out.getvalue()
+    assert 'Строка 3: Некорректный JSON' in err.getvalue()
+    assert 'Строка 4: Ожидался объект' in err.getvalue()
+    assert Comment.objects.count() == 2
+
+
+def test_load_news_fixture_command():
+    """Команда load_news_fixture загружает news.json по частям."""
+    out = StringIO()
+    call_command(
+        'load_news_fixture', str(NEWS_FIXTURE), '--batch-size', '5',
+        stdout=out
+    )
+    assert News.objects.count() == 19
+    assert 'news.News: 19' in out.getvalue()
+    assert search_ids('мобильная разработка') == [
+        News.objects.get(title='Новости мобильной разработки').pk
+    ]
+
+
+def test_dump_and_load_fixture_round_trip(comment_list, news):
+    """Выгруженная фикстура загружается обратно без потерь."""
+    stream = StringIO()
+    dump_fixture(stream)
+    expected = list(Comment.objects.values_list('id', 'news', 'text'))
+    Comment.objects.all().delete()
+    News.objects.all().delete()
+    stream.seek(0)
+    loaded = load_fixture(stream, batch_size=4)
+    assert loaded == {'news.News': 1, 'news.Comment': len(expected)}
+    assert list(
+        Comment.objects.values_list('id', 'news', 'text')
+    ) == expected
+    news.refresh_from_db()
+    assert news.comment_count == len(expected)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 1024))
+def test_iter_json_array_reads_elements(chunk_size):
+    """Элементы собираются из блоков любого размера."""
+    stream = StringIO(' [ {"a": "x, y"} ,\n{"b": [1, 2]}, {} ] ')
+    assert list(iter_json_array(stream, chunk_size=chunk_size)) == [
+        {'a': 'x, y'}, {'b': [1, 2]}, {}
+    ]
+
+
+@pytest.mark.parametrize(
+    'data',
+    ('[, {}]', '[{},, {}]', '[{} {}]', '[{}, ]'),
+    ids=('leading', 'double', 'missing', 'trailing')
+)
+def test_iter_json_array_requires_single_commas(data):
+    """Между элементами должна стоять ровно одна запятая."""
+    with pytest.raises(DeserializationError, match='Некорректный JSON'):
+        list(iter_json_array(StringIO(data), chunk_size=2))
+
+
+def test_iter_json_array_stops_on_broken_element():
+    """
+    Битый элемент не заставляет дочитывать весь файл: после предела
+    размера ошибка сообщает позицию элемента.
+    """
+    stream = StringIO('[{}, {"a": 1 "b": 2}, ' + '{"c": 3}, ' * 10000 + '{}]')
+    elements = iter_json_array(stream, chunk_size=16, max_object_size=64)
+    assert next(elements) == {}
+    with pytest.raises(DeserializationError, match='в позиции 13:'):
+        next(elements)
+    assert stream.tell() < 1024
+
+
+def test_async_view_creates_comment(
+        rf, author, news, form_data, news_detail_url, url_for_comments
+):
+    """Асинхронная страница новости принимает комментарий."""
+    request = rf.post(news_detail_url, data=form_data)
+    request.user = author
+    response = async_to_sync(async_views.news_detail)(request, pk=news.pk)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == url_for_comments
+    assert Comment.objects.get().author == author
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_search_index_follows_news_changes(news):
+    """Индекс обновляется при изменении и удалении новости."""
+    assert search_ids('заголовок') == [news.pk]
+    news.title = 'Новый выпуск'
+    news.save()
+    assert search_ids('заголовок') == []
+    assert search_ids('выпуск') == [news.pk]
+    news_id = news.pk
+    news.delete()
+    assert search_ids('выпуск') == []
+    assert news_id not in search_ids('текст')
+
+
+def test_rebuild_news_search_command(news_list):
+    """Новости, созданные в обход сигналов, попадают в индекс командой."""
+    assert search_ids('заголовок') == []
+    out = StringIO()
+    call_command('rebuild_news_search', '--batch-size', '4', stdout=out)
+    assert len(search_ids('заголовок', limit=100)) == News.objects.count()
+    assert f'Проиндексировано новостей: {News.objects.count()}' in (
+        out.getvalue()
+    )
+
+
+def test_sqlite_backend_applies_pragmas(tmp_path):
+    """Бэкенд выполняет PRAGMA из OPTIONS, а реплика открыта на чтение."""
+    database = {
+        'ENGINE': 'common.sqlite',
+        'NAME': tmp_path / 'db.sqlite3',
+        'OPTIONS': {'pragmas': settings.SQLITE_PERFORMANCE_PRAGMAS},
+    }
+    replica = {
+        **database,
+        'OPTIONS': {
+            'pragmas': settings.SQLITE_REPLICA_PRAGMAS,
+            'read_only': True,
+        },
+    }
+    handler = ConnectionHandler({'default': database, 'replica': replica})
+    try:
+        with handler['default'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone() == ('wal',)
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone() == (5000,)
+            cursor.execute('CREATE TABLE example (id integer)')
+        with handler['replica'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM example')
+            with pytest.raises(OperationalError):
+                cursor.execute('INSERT INTO example VALUES (1)')
+    finally:
+        handler.close_all()
+
+
+def test_replica_router_reads_pages_only():
+    """На реплику уходят только чтения GET-запросов к страницам новостей."""
+    router = ReadReplicaRouter()
+
+    class PageView(ReplicaReadMixin, View):
+        def get(self, request):
+            return HttpResponse(router.db_for_read(News))
+
+        post = get
+
+    view = PageView.as_view()
+    factory = RequestFactory()
+    assert view(factory.get('/')).content == b'replica'
+    assert view(factory.post('/')).content == b'None'
+    assert router.db_for_read(News) is None
+    assert router.db_for_write(News) is None
+    assert not router.allow_migrate('replica', 'news')
+
+
+def test_page_cache_keeps_view_headers():
+    """
+    Из кеша страница отдаётся с заголовками представления, а ответы
+    с cookie и запросы с посторонними параметрами не кешируются.
+    """
+    calls = []
+
+    class PageView(AnonymousPageCacheMixin, View):
+        page_cache_scope = 'test'
+        page_cache_params = ('cursor',)
+
+        def get(self, request):
+            calls.append(request.get_full_path())
+            response = HttpResponse('{}', content_type='application/json')
+            response['Vary'] = 'Accept-Language'
+            if 'cookie' in request.path:
+                response.set_cookie('seen', '1')
+            return response
+
+    view = PageView.as_view()
+    factory = RequestFactory()
+
+    def get(path):
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        return view(request)
+
+    for path in ('/', '/?cursor=a', '/cookie/', '/?utm=1'):
+        get(path)
+        response = get(path)
+        assert response['Content-Type'] == 'application/json'
+        assert response['Vary'] == 'Accept-Language'
+    assert calls == [
+        '/', '/?cursor=a', '/cookie/', '/cookie/', '/?utm=1', '/?utm=1'
+    ]
+
+
+def test_page_cache_scope_must_be_declared():
+    """Без области кеша представление сообщает об ошибке настройки."""
+    class PageView(AnonymousPageCacheMixin, View):
+        def get(self, request):
+            return HttpResponse()
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    with pytest.raises(ImproperlyConfigured, match='page_cache_scope'):
+        PageView.as_view()(request)
+
+
+def test_conditional_page_requires_validators():
+    """Без get_validator_values представление сообщает об ошибке."""
+    class PageView(ConditionalPageMixin, View):
+        def get(self, request):
+            return HttpResponse()
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    with pytest.raises(ImproperlyConfigured, match='get_validator_values'):
+        PageView.as_view()(request)
+
+
+def test_cached_user_is_invalidated(author, author_client, logout_url):
+    """Запись о пользователе сбрасывается при сохранении и выходе."""
+    backend = CachedModelBackend()
+    key = user_cache_key(author.pk)
+    assert backend.get_user(author.pk) == author
+    author.username = 'Новое имя'
+    author.save()
+    assert get_user_cache().get(key) is None
+    assert backend.get_user(author.pk).username == 'Новое имя'
+    author_client.get(logout_url)
+    assert get_user_cache().get(key) is None
+
+
+def test_user_cache_can_be_disabled(author, settings):
+    """С AUTH_USER_CACHE_TIMEOUT = 0 пользователь не попадает в кеш."""
+    settings.AUTH_USER_CACHE_TIMEOUT = 0
+    assert CachedModelBackend().get_user(author.pk) == author
+    assert get_user_cache().get(user_cache_key(author.pk)) is None
+
+
+def test_model_backend_sessions_stay_valid(client, author, home_url):
+    """Сессии с путём ModelBackend после смены бэкенда не сбрасываются."""
+    client.force_login(
+        author, backend='django.contrib.auth.backends.ModelBackend'
+    )
+    response = client.get(home_url)
+    assert response.wsgi_request.user == author
+
+
+@pytest.mark.parametrize(
+    'cache_env, session_engine, user_cache_timeout',
+    (
+        ({}, 'django.contrib.sessions.backends.db', 0),
+        (
+            {'DJANGO_CACHE_BACKEND':
+             'django.core.cache.backends.dummy.DummyCache'},
+            'django.contrib.sessions.backends.cached_db',
+            300,
+        ),
+    )
+)
+def test_prod_settings_need_shared_cache_for_sessions(
+        cache_env, session_engine, user_cache_timeout
+):
+    """Без общего кеша боевые настройки хранят сессии только в базе."""
+    with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'test'}):
+        os.environ.pop('DJANGO_CACHE_BACKEND', None)
+        os.environ.update(cache_env)
+        prod = importlib.reload(
+            importlib.import_module('yanews.settings.prod')
+        )
+    assert prod.SESSION_ENGINE == session_engine
+    assert prod.AUTH_USER_CACHE_TIMEOUT == user_cache_timeout
+
+
+def test_warm_up_fills_cached_loader(settings):
+    """Прогрев компилирует все шаблоны проекта в кеш загрузчика."""
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'],
+            'loaders': [('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+            ])],
+        },
+    }]
+    templates = list((settings.BASE_DIR / 'templates').rglob('*.html'))
+    assert warm_up_templates() == len(templates)
+    loader = engines['django'].engine.template_loaders[0]
+    assert len(loader.get_template_cache) == len(templates)
+
+
+def test_warm_up_fails_on_syntax_error(settings, tmp_path):
+    """Ошибка синтаксиса в шаблоне обнаруживается при прогреве."""
+    (tmp_path / 'broken.html').write_text('{% if %}', encoding='utf-8')
+    settings.TEMPLATES = [{**settings.TEMPLATES[0], 'DIRS': [tmp_path]}]
+    with pytest.raises(TemplateSyntaxError):
+        warm_up_templates()
+
+
+@pytest.mark.parametrize('precompiled, calls', ((True, 1), (False, 0)))
+def test_app_ready_warms_up_templates(settings, precompiled, calls):
+    """Приложение прогревает шаблоны при старте, если это включено."""
+    settings.TEMPLATES_PRECOMPILED = precompiled
+    with mock.patch('common.warmup.warm_up_templates') as warm_up:
+        apps.get_app_config('news').ready()
+    assert warm_up.call_count == calls
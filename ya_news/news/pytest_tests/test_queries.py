@@ -0,0 +1,135 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_django.asserts import assertRedirects
+
+from news.models import Comment, News
+
+# Бюджеты запросов: (страница, клиент, допустимое число запросов).
+# Авторизованному клиенту с пустым кешем нужны ещё два запроса:
+# сессия и пользователь.
+BUDGETS = (
+    ('home_url', 'client', 1),
+    ('home_url', 'author_client', 3),
+    ('news_detail_url', 'client', 2),
+    ('news_detail_url', 'author_client', 4),
+)
+# Сессия, созданная force_login, уже лежит в кеше, поэтому ниже
+# из запросов аутентификации остаётся только загрузка пользователя.
+# Отправка комментария: пользователь, новость, вставка комментария,
+# обновление счётчика и две команды точки сохранения.
+COMMENT_POST_QUERIES = 6
+# Редактирование и удаление комментария: (страница, метод, число запросов).
+# Комментарий загружается одним запросом, редирект строится без запросов.
+COMMENT_ACTION_QUERIES = (
+    ('comment_edit_url', 'get', 2),
+    ('comment_edit_url', 'post', 3),
+    ('comment_delete_url', 'get', 2),
+    # Удаление и пересчёт счётчика выполняются в одной транзакции.
+    ('comment_delete_url', 'post', 6),
+)
+# Таблицы, к которым не должно быть запросов при тёплом кеше.
+AUTH_TABLES = ('FROM "django_session"', 'FROM "auth_user"')
+
+
+@pytest.fixture
+def seed_news():
+    def seed(size):
+        News.objects.bulk_create(
+            News(title=f'Заголовок {index}', text='Просто текст.')
+            for index in range(News.objects.count(), size)
+        )
+    return seed
+
+
+@pytest.fixture
+def seed_comments(news, author):
+    def seed(size):
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(news.comment_set.count(), size)
+        )
+    return seed
+
+
+@pytest.mark.parametrize('url_name, client_name, budget', BUDGETS)
+def test_query_budget(
+        request,
+        assert_query_budget,
+        seed_news,
+        seed_comments,
+        url_name,
+        client_name,
+        budget
+):
+    """Страницы укладываются в бюджет запросов при 1, 100 и 10 000 строк."""
+    url = request.getfixturevalue(url_name)
+    client = request.getfixturevalue(client_name)
+    seed = seed_news if url_name == 'home_url' else seed_comments
+    assert_query_budget(lambda: client.get(url), seed, budget)
+
+
+def test_comment_post_queries(
+        author_client,
+        django_assert_num_queries,
+        news_detail_url,
+        form_data
+):
+    """Новость загружается при отправке комментария только один раз."""
+    with django_assert_num_queries(COMMENT_POST_QUERIES):
+        author_client.post(news_detail_url, data=form_data)
+
+
+@pytest.mark.parametrize('url_name, method, queries', COMMENT_ACTION_QUERIES)
+def test_comment_action_queries(
+        request,
+        author_client,
+        django_assert_num_queries,
+        form_data,
+        url_for_comments,
+        url_name,
+        method,
+        queries
+):
+    """Редактирование и удаление не перечитывают комментарий и новость."""
+    url = request.getfixturevalue(url_name)
+    with django_assert_num_queries(queries):
+        response = getattr(author_client, method)(url, data=form_data)
+    if method == 'post':
+        assertRedirects(response, url_for_comments)
+
+
+def test_warm_cache_skips_session_and_user_queries(
+        author_client,
+        news_detail_url
+):
+    """Повторный запрос берёт сессию и пользователя из кеша."""
+    author_client.get(news_detail_url)
+    with CaptureQueriesContext(connection) as context:
+        author_client.get(news_detail_url)
+    auth_queries = [
+        query['sql'] for query in context.captured_queries
+        if any(table in query['sql'] for table in AUTH_TABLES)
+    ]
+    assert auth_queries == []
+
+
+@pytest.mark.parametrize('url_name', ('home_url', 'news_detail_url'))
+def test_not_modified_page_queries(
+        request,
+        client,
+        django_assert_num_queries,
+        comment,
+        url_name
+):
+    """Ответ 304 строится одним запросом, без отрисовки шаблона."""
+    url = request.getfixturevalue(url_name)
+    etag = client.get(url)['ETag']
+    caches['default'].clear()
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.templates
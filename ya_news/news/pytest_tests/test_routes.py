@@ -3,6 +3,8 @@ from http import HTTPStatus
 import pytest
 from pytest_django.asserts import assertRedirects
 
+from common.profiling import profiling_summary, reset_profiling_summary
+
 
 # Константы для страниц
 HOME = pytest.lazy_fixture('home_url')
@@ -12,10 +14,12 @@ COMMENT_DELETE = pytest.lazy_fixture('comment_delete_url')
 LOGIN = pytest.lazy_fixture('login_url')
 LOGOUT = pytest.lazy_fixture('logout_url')
 SIGNUP = pytest.lazy_fixture('signup_url')
+SEARCH = pytest.lazy_fixture('search_url')
 # Константы для клиента, через который делается запрос
 AUTHOR_CLIENT = pytest.lazy_fixture('author_client')
 READER_CLIENT = pytest.lazy_fixture('reader_client')
 CLIENT = pytest.lazy_fixture('client')
+ADMIN_CLIENT = pytest.lazy_fixture('admin_client')
 
 
 @pytest.mark.parametrize(
@@ -26,6 +30,7 @@ CLIENT = pytest.lazy_fixture('client')
         (LOGIN, CLIENT, HTTPStatus.OK),
         (LOGOUT, CLIENT, HTTPStatus.OK),
         (SIGNUP, CLIENT, HTTPStatus.OK),
+        (SEARCH, CLIENT, HTTPStatus.OK),
         (COMMENT_EDIT, READER_CLIENT, HTTPStatus.NOT_FOUND),
         (COMMENT_EDIT, AUTHOR_CLIENT, HTTPStatus.OK),
         (COMMENT_DELETE, READER_CLIENT, HTTPStatus.NOT_FOUND),
@@ -55,3 +60,54 @@ def test_redirects(client, url, login_url, comment_list):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+def test_profiling_middleware(client, settings, tmp_path, news_detail_url):
+    """
+    Профилирующий middleware отдаёт Server-Timing, копит статистику
+    по маршруту и по заголовку сохраняет профиль cProfile.
+    """
+    settings.REQUEST_PROFILING = True
+    settings.REQUEST_PROFILING_DUMP_DIR = tmp_path
+    settings.DEBUG = True
+    reset_profiling_summary()
+    response = client.get(news_detail_url, HTTP_X_PROFILE='1')
+    server_timing = response['Server-Timing']
+    for metric in ('sql;', 'template;', 'view;', 'total;'):
+        assert metric in server_timing
+    assert '2 queries' in server_timing
+    assert profiling_summary()['news:detail']['requests'] == 1
+    assert len(list(tmp_path.glob('news-detail-*.prof'))) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'parametrized_client, debug, dumps',
+    (
+        (CLIENT, False, 0),
+        (READER_CLIENT, False, 0),
+        (ADMIN_CLIENT, False, 1),
+        (CLIENT, True, 1),
+    )
+)
+def test_profiling_header_needs_staff_or_debug(
+        parametrized_client, debug, dumps, settings, tmp_path, home_url
+):
+    """Профиль по заголовку снимается только для сотрудника или при DEBUG."""
+    settings.REQUEST_PROFILING = True
+    settings.REQUEST_PROFILING_DUMP_DIR = tmp_path
+    settings.DEBUG = debug
+    parametrized_client.get(home_url, HTTP_X_PROFILE='1')
+    assert len(list(tmp_path.glob('*.prof'))) == dumps
+
+
+@pytest.mark.django_db
+def test_profiling_keeps_last_dumps(client, settings, tmp_path, home_url):
+    """В каталоге остаются только REQUEST_PROFILING_MAX_DUMPS профилей."""
+    settings.REQUEST_PROFILING = True
+    settings.REQUEST_PROFILING_DUMP_DIR = tmp_path
+    settings.REQUEST_PROFILING_MAX_DUMPS = 2
+    settings.DEBUG = True
+    for _ in range(3):
+        client.get(home_url, HTTP_X_PROFILE='1')
+    assert len(list(tmp_path.glob('*.prof'))) == 2
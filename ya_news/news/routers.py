@@ -0,0 +1,50 @@
+"""
+Чтение страниц новостей через реплику.
+
+ReadReplicaRouter подключается вместе с псевдонимом базы replica
+в yanews.settings.prod. Чтения уходят на реплику только внутри
+read_from_replica(), то есть во время GET-запросов к страницам, где
+включён ReplicaReadMixin; всё остальное, включая любые записи, идёт
+в основную базу.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REPLICA_ALIAS = 'replica'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return REPLICA_ALIAS if _use_replica.get() else None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — тот же файл базы, объекты из обеих совместимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+class ReplicaReadMixin:
+    """Выполняет чтения GET- и HEAD-запросов через реплику."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,63 @@
+"""
+Полнотекстовый поиск по новостям.
+
+Индекс — виртуальная таблица SQLite FTS5 news_search с rowid, равным id
+новости (common.textsearch.SearchIndex). В неё записываются не исходные
+заголовок и текст, а основы слов, поэтому «новости», «новостей»
+и «новость» находят друг друга.
+
+Индекс обновляется сигналами при сохранении и удалении новости,
+а целиком перестраивается командой rebuild_news_search. Для баз,
+отличных от SQLite, поиск отключён.
+"""
+from django.db import connection
+
+from common.textsearch import INDEX_BATCH_SIZE, SearchIndex, match_words
+
+# Совпадение в заголовке весит больше, чем в тексте.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+index = SearchIndex(
+    'news_search', ('title', 'text'), (TITLE_WEIGHT, TEXT_WEIGHT)
+)
+
+
+def create_index(using=connection):
+    index.create(using)
+
+
+def index_rows(rows, using=connection):
+    """Добавляет или заменяет в индексе строки (id, заголовок, текст)."""
+    index.index_rows(rows, using)
+
+
+def index_news(news):
+    index_rows([(news.pk, news.title, news.text)])
+
+
+def remove_news(pk):
+    index.remove(pk)
+
+
+def rebuild_index(queryset, batch_size=INDEX_BATCH_SIZE, using=connection):
+    """
+    Перестраивает индекс по queryset новостей, пачками по batch_size.
+
+    Возвращает число проиндексированных новостей.
+    """
+    rows = queryset.values_list('pk', 'title', 'text').iterator()
+    return index.rebuild(rows, batch_size, using)
+
+
+def build_query(query):
+    """
+    Превращает запрос пользователя в выражение MATCH.
+
+    Все слова запроса должны встретиться в новости.
+    """
+    return match_words(query)
+
+
+def search_ids(query, offset=0, limit=10):
+    """Возвращает id подходящих новостей, от самых релевантных."""
+    return index.search(build_query(query), offset, limit)
@@ -0,0 +1,370 @@
+"""Массовая загрузка и выгрузка данных новостей."""
+import csv
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain, islice
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .cache import ALL_SCOPE, HOME_SCOPE, detail_scope, invalidate_on_commit
+from .forms import WARNING, bad_words_filter
+from .models import Comment, News
+
+COMMENT_IMPORT_BATCH_SIZE = 500
+FIXTURE_BATCH_SIZE = 500
+FIXTURE_CHUNK_SIZE = 64 * 1024
+# Больше этого один элемент фикстуры занимать не может: иначе битый
+# элемент заставил бы дочитать в память весь остаток файла.
+FIXTURE_MAX_OBJECT_SIZE = 4 * 1024 * 1024
+# Порядок важен: комментарии ссылаются на новости.
+FIXTURE_MODELS = (News, Comment)
+_WHITESPACE = re.compile(r'\s*')
+
+User = get_user_model()
+
+
+@dataclass
+class ImportReport:
+    """Итоги загрузки: сколько создано и какие строки отклонены."""
+    created: int = 0
+    rejected: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        """Скорость загрузки, комментариев в секунду."""
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+class RowError(ValueError):
+    """Строка файла не годится для загрузки; текст — причина отказа."""
+
+
+def read_rows(stream, file_format):
+    """
+    Построчно читает комментарии из CSV или JSON Lines.
+
+    Отдаёт пары (номер строки в файле, строка). Строка JSON Lines,
+    которую не удалось разобрать, отдаётся как RowError и попадает
+    в отклонённые. Файл целиком в память не загружается.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = RowError(f'Некорректный JSON: {error}')
+        yield number, row
+
+
+def _parse_created(value):
+    if not value:
+        return timezone.now()
+    if not isinstance(value, str):
+        raise RowError(f'Некорректная дата: {value!r}')
+    try:
+        created = parse_datetime(value)
+    except ValueError:
+        created = None
+    if created is None:
+        raise RowError(f'Некорректная дата: {value}')
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created)
+    return created
+
+
+def _parse_news_id(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+
+
+def _parse_row(row):
+    """
+    Проверяет типы полей строки.
+
+    Возвращает (id новости, имя автора, текст, время создания) или
+    поднимает RowError.
+    """
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError('Ожидался объект с полями news, author, text')
+    author = row.get('author')
+    if not isinstance(author, str):
+        raise RowError('Автор не найден')
+    text = row.get('text') or ''
+    if not isinstance(text, str):
+        raise RowError('Текст должен быть строкой')
+    if not text.strip():
+        raise RowError('Пустой текст')
+    return (
+        _parse_news_id(row.get('news')),
+        author,
+        text,
+        _parse_created(row.get('created')),
+    )
+
+
+def _build_comment(fields, existing_news, authors):
+    """Возвращает комментарий из проверенных полей или причину отказа."""
+    news_id, author, text, created = fields
+    if news_id not in existing_news:
+        return None, 'Новость не найдена'
+    if author not in authors:
+        return None, 'Автор не найден'
+    word = bad_words_filter.find(text)
+    if word is not None:
+        return None, f'{WARNING} ({word})'
+    return Comment(
+        news_id=news_id,
+        author_id=authors[author],
+        text=text,
+        created=created,
+    ), None
+
+
+def _parse_batch(batch):
+    """Делит пачку на проверенные поля и отказы (номер, причина)."""
+    parsed, rejected = [], []
+    for number, row in batch:
+        try:
+            parsed.append((number, _parse_row(row)))
+        except (ValueError, TypeError) as error:
+            rejected.append((number, str(error)))
+    return parsed, rejected
+
+
+def _import_batch(batch, report):
+    parsed, rejected = _parse_batch(batch)
+    existing_news = set(News.objects.filter(
+        pk__in={fields[0] for _, fields in parsed}
+    ).values_list('pk', flat=True))
+    authors = dict(User.objects.filter(
+        username__in={fields[1] for _, fields in parsed}
+    ).values_list('username', 'pk'))
+    comments = []
+    for number, fields in parsed:
+        comment, reason = _build_comment(fields, existing_news, authors)
+        if comment is None:
+            rejected.append((number, reason))
+        else:
+            comments.append(comment)
+    report.rejected.extend(sorted(rejected))
+    if not comments:
+        return
+    added = Counter(comment.news_id for comment in comments)
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        News.objects.filter(pk__in=added).update(
+            comment_count=F('comment_count') + Case(*(
+                When(pk=news_id, then=count)
+                for news_id, count in added.items()
+            )),
+            updated=timezone.now()
+        )
+        # bulk_create не отправляет сигналы — сбрасываем кеш страниц сами.
+        invalidate_on_commit(
+            HOME_SCOPE, *(detail_scope(news_id) for news_id in added)
+        )
+    report.created += len(comments)
+
+
+def import_comments(
+        rows, batch_size=COMMENT_IMPORT_BATCH_SIZE, numbered=False
+):
+    """
+    Загружает комментарии пачками по batch_size.
+
+    Каждая строка — словарь с ключами news (id новости), author (имя
+    пользователя), text и необязательным created в формате ISO 8601.
+    Строки нумеруются с единицы; с numbered=True rows уже состоит
+    из пар (номер, строка), как их отдаёт read_rows. Строки с полями
+    не того типа и не разобранные строки файла отклоняются со своим
+    номером, не прерывая загрузку. Строки проверяются тем же фильтром,
+    что и CommentForm.clean_text. Каждая пачка вставляется одним
+    bulk_create в своей транзакции, поэтому при сбое уже загруженные
+    пачки сохраняются.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    numbered_rows = iter(rows) if numbered else enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered_rows, batch_size))
+        if not batch:
+            break
+        _import_batch(batch, report)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+class _JsonArrayReader:
+    """Разбирает JSON-массив из потока, держа в памяти один элемент."""
+
+    def __init__(self, stream, chunk_size, max_object_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_object_size = max_object_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        # Смещение начала буфера от начала потока, для сообщений об ошибках.
+        self.offset = 0
+
+    @staticmethod
+    def error(message, position):
+        return DeserializationError(
+            f'Некорректный JSON в позиции {position}: {message}'
+        )
+
+    def read_more(self):
+        """
+        Отбрасывает разобранное начало буфера и дочитывает поток.
+
+        Блок не меньше уже накопленного остатка, поэтому длинный элемент
+        разбирается заново лишь логарифмическое число раз.
+        """
+        pending = self.buffer[self.position:]
+        chunk = self.stream.read(max(self.chunk_size, len(pending)))
+        self.offset += self.position
+        self.buffer, self.position = pending + chunk, 0
+        return bool(chunk)
+
+    def next_token(self):
+        """Пропускает пробелы и возвращает следующий символ."""
+        while True:
+            self.position = _WHITESPACE.match(
+                self.buffer, self.position
+            ).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                raise DeserializationError('Неожиданный конец файла.')
+
+    def skip(self, token, expected):
+        """Съедает ожидаемый символ или сообщает, где его не нашлось."""
+        if self.next_token() != token:
+            raise self.error(
+                f'ожидалось {expected}', self.offset + self.position
+            )
+        self.position += 1
+
+    def decode(self):
+        """Разбирает очередной элемент, дочитывая поток по мере нужды."""
+        self.next_token()
+        while True:
+            try:
+                obj, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return obj
+            except json.JSONDecodeError as error:
+                position = self.offset + error.pos
+                too_big = (
+                    len(self.buffer) - self.position > self.max_object_size
+                )
+                if too_big or not self.read_more():
+                    raise self.error(error.msg, position) from error
+
+
+def iter_json_array(
+        stream,
+        chunk_size=FIXTURE_CHUNK_SIZE,
+        max_object_size=FIXTURE_MAX_OBJECT_SIZE,
+):
+    """
+    Читает JSON-массив объектов по одному элементу.
+
+    В памяти держится только текущий элемент и непрочитанный остаток
+    очередного блока, а не весь файл. Элементы разделяются ровно одной
+    запятой. Элемент, который не разобрался и за max_object_size
+    символов, считается битым: ошибка сообщает его позицию в потоке.
+    """
+    reader = _JsonArrayReader(stream, chunk_size, max_object_size)
+    if reader.next_token() != '[':
+        raise DeserializationError('Ожидался JSON-массив.')
+    reader.position += 1
+    if reader.next_token() == ']':
+        return
+    while True:
+        yield reader.decode()
+        if reader.next_token() == ']':
+            return
+        reader.skip(',', "',' или ']'")
+
+
+def load_fixture(stream, batch_size=FIXTURE_BATCH_SIZE):
+    """
+    Загружает фикстуру формата news.json потоково.
+
+    Объекты копятся пачками и вставляются через bulk_create, поэтому
+    сигналы на каждый объект не отправляются; новости добавляются
+    в поисковый индекс пачками, а счётчики комментариев и кеш страниц
+    обновляются один раз в конце. Загрузка идёт одной
+    транзакцией, как у loaddata; записи с уже занятым pk не обновляются,
+    а приводят к ошибке. Возвращает число загруженных объектов по моделям.
+    """
+    batches = {model: [] for model in FIXTURE_MODELS}
+    loaded = Counter()
+
+    def flush():
+        for model, objects in batches.items():
+            if objects:
+                model.objects.bulk_create(objects)
+                if model is News:
+                    search.index_rows(
+                        [(obj.pk, obj.title, obj.text) for obj in objects]
+                    )
+                loaded[model._meta.label] += len(objects)
+                objects.clear()
+
+    with transaction.atomic():
+        for deserialized in Deserializer(iter_json_array(stream)):
+            obj = deserialized.object
+            if type(obj) not in batches:
+                raise DeserializationError(
+                    f'Модель {obj._meta.label} не поддерживается.'
+                )
+            batches[type(obj)].append(obj)
+            if len(batches[type(obj)]) >= batch_size:
+                flush()
+        flush()
+        if loaded[Comment._meta.label]:
+            News.objects.recount_comments()
+        invalidate_on_commit(ALL_SCOPE)
+    return loaded
+
+
+def dump_fixture(stream, indent=None):
+    """Выгружает все новости и комментарии в формате news.json потоково."""
+    serializers.serialize(
+        'json',
+        chain.from_iterable(
+            model.objects.order_by('pk').iterator()
+            for model in FIXTURE_MODELS
+        ),
+        stream=stream,
+        indent=indent,
+    )
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.backends import invalidate_user
+
+from . import search
+from .cache import HOME_SCOPE, detail_scope, invalidate_on_commit
+from .models import Comment, News
+
+
+@receiver([post_save, post_delete], sender=News)
+def invalidate_news_pages(sender, instance, **kwargs):
+    invalidate_on_commit(HOME_SCOPE, detail_scope(instance.pk))
+
+
+@receiver(post_save, sender=News)
+def index_news(sender, instance, **kwargs):
+    search.index_news(instance)
+
+
+@receiver(post_delete, sender=News)
+def remove_news_from_index(sender, instance, **kwargs):
+    search.remove_news(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    # На главной выводится число комментариев, поэтому сбрасываем и её.
+    invalidate_on_commit(HOME_SCOPE, detail_scope(instance.news_id))
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_user_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
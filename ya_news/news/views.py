@@ -1,39 +1,188 @@
+from functools import cached_property
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
 from django.views import generic
 
+from common.textsearch import parse_page
+
+from .cache import HOME_SCOPE, AnonymousPageCacheMixin, detail_scope
+from .conditional import ConditionalPageMixin
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import encode_cursor, seek
+from .routers import ReplicaReadMixin
+from .search import search_ids
 
 
-class NewsList(generic.ListView):
+class NewsList(
+        ReplicaReadMixin,
+        AnonymousPageCacheMixin,
+        ConditionalPageMixin,
+        generic.ListView
+):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    page_cache_scope = HOME_SCOPE
+    page_cache_params = ('cursor',)
+    # К Meta.ordering добавлен id, чтобы порядок и курсор были однозначны.
+    ordering = ('-date', '-id')
 
-    def get_queryset(self):
+    @cached_property
+    def page_news(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Следующие страницы
+        выбираются по курсору: с новости, идущей сразу после последней
+        показанной, без OFFSET. Queryset создаётся один раз на запрос:
+        строки, загруженные для ETag, затем выводятся
+        в шаблоне без повторного запроса.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
+        return seek(
+            self.model.objects.all(),
+            self.ordering,
+            self.request.GET.get('cursor')
         )[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
+    def get_queryset(self):
+        return self.page_news
+
+    def get_validator_values(self):
+        # Last-Modified не отдаётся: после удаления новости на страницу
+        # встаёт более старая, и максимум updated не меняется. Состав
+        # страницы учитывает только ETag.
+        return [(news.pk, news.updated) for news in self.page_news]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        news = context['object_list']
+        if len(news) == settings.NEWS_COUNT_ON_HOME_PAGE:
+            context['next_cursor'] = encode_cursor(
+                news[len(news) - 1], self.ordering
+            )
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """
+    Поиск новостей по заголовку и тексту.
+
+    Результаты упорядочены по релевантности и выводятся постранично;
+    на каждую страницу — запрос к поисковому индексу и выборка
+    найденных новостей по id.
+    """
+    template_name = 'news/search.html'
+    context_object_name = 'results'
 
-class NewsDetail(generic.DetailView):
+    def get_page_number(self):
+        return parse_page(self.request.GET.get('page', 1))
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        self.page = self.get_page_number()
+        per_page = settings.SEARCH_RESULTS_PER_PAGE
+        # Одна лишняя запись показывает, есть ли следующая страница.
+        ids = search_ids(
+            self.query, (self.page - 1) * per_page, per_page + 1
+        )
+        self.has_next = len(ids) > per_page
+        ids = ids[:per_page]
+        found = News.objects.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        if self.page > 1:
+            context['previous_page'] = self.page - 1
+        if self.has_next:
+            context['next_page'] = self.page + 1
+        return context
+
+
+class CommentPageMixin:
+    """Добавляет в контекст одну страницу комментариев к новости."""
+    comment_ordering = ('created', 'id')
+
+    def get_comments(self):
+        """
+        Комментарии выбираются по курсору, а у автора загружается
+        только то, что выводится в шаблоне.
+        """
+        comments = Comment.objects.filter(
+            news=self.object
+        ).select_related('author').only(
+            'text', 'created', 'updated', 'author', 'author__username'
+        )
+        return seek(
+            comments,
+            self.comment_ordering,
+            self.request.GET.get('cursor')
+        )[:settings.COMMENTS_COUNT_ON_DETAIL_PAGE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments = self.get_comments()
+        context['comments'] = comments
+        context['comment_cache_timeout'] = (
+            settings.COMMENT_FRAGMENT_CACHE_TIMEOUT
+        )
+        if len(comments) == settings.COMMENTS_COUNT_ON_DETAIL_PAGE:
+            context['next_cursor'] = encode_cursor(
+                comments[len(comments) - 1], self.comment_ordering
+            )
+        return context
+
+
+class NewsDetail(
+        ReplicaReadMixin,
+        AnonymousPageCacheMixin,
+        ConditionalPageMixin,
+        CommentPageMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
+    page_cache_params = ('cursor',)
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
+    def get_page_cache_scope(self):
+        return detail_scope(self.kwargs['pk'])
+
+    @cached_property
+    def news(self):
+        """
+        Новость вместе со временем последнего изменения её комментариев:
+        оба значения нужны для ETag, и берутся они одним запросом.
+        """
+        last_comment = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-updated').values('updated')[:1]
+        return get_object_or_404(
+            self.model.objects.annotate(
+                comments_updated=Subquery(last_comment)
+            ),
             pk=self.kwargs['pk']
         )
-        return obj
+
+    def get_object(self, queryset=None):
+        return self.news
+
+    def get_validator_values(self):
+        return [self.news.pk, self.news.updated, self.news.comments_updated]
+
+    def get_last_modified(self):
+        # Добавление и удаление комментария сдвигают updated новости,
+        # а правка — только updated самого комментария.
+        return max(filter(None, (
+            self.news.updated, self.news.comments_updated
+        )))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +193,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,46 +209,83 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
+            News.objects.filter(pk=self.object.pk).update(
+                comment_count=F('comment_count') + 1,
+                updated=timezone.now()
+            )
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        # Новость уже загружена в post(), повторный запрос не нужен.
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    """
+    Страница новости: GET показывает её, POST добавляет комментарий.
+
+    Функции представлений создаются один раз при импорте, а не на
+    каждый запрос.
+    """
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
-    """Базовый класс для работы с комментариями."""
+    """
+    Базовый класс для работы с комментариями.
+
+    Комментарий загружается один раз и только с нужными полями: для
+    страницы подтверждения — с заголовком новости, для POST-запроса —
+    с полями из post_fields. Адрес редиректа строится по news_id без
+    дополнительных запросов.
+    """
     model = Comment
+    page_fields = ('text', 'created', 'news', 'news__title')
+    post_fields = ('news',)
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        queryset = self.model.objects.filter(author=self.request.user)
+        if self.request.method == 'POST':
+            return queryset.only(*self.post_fields)
+        return queryset.select_related('news').only(*self.page_fields)
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
     """Редактирование комментария."""
     template_name = 'news/edit.html'
     form_class = CommentForm
+    # При сохранении с отложенными полями обновляются только загруженные,
+    # поэтому updated нужен, чтобы сработал auto_now.
+    post_fields = ('news', 'text', 'updated')
 
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        """
+        После удаления пересчитываем счётчик новости целиком:
+        так он выправляется, даже если ранее разошёлся с данными.
+        """
+        response = super().delete(request, *args, **kwargs)
+        News.objects.filter(pk=self.object.news_id).recount_comments()
+        return response
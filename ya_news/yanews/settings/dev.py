@@ -0,0 +1,8 @@
+"""Настройки для разработки и тестов."""
+from .base import *
+
+SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
+
+DEBUG = True
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
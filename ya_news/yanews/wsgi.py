@@ -8,9 +8,17 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 """
 
 import os
+import sys
+from pathlib import Path
 
-from django.core.wsgi import get_wsgi_application
+# Пакет common с кодом, общим для ya_news и ya_note, лежит в корне
+# репозитория, на уровень выше проекта.
+REPO_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings.prod')
 
 application = get_wsgi_application()
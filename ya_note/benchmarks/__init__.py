@@ -0,0 +1,34 @@
+"""
+Бенчмарки проекта YaNote.
+
+Запускаются из каталога ya_note как модули:
+
+    python -m benchmarks.load
+    python -m benchmarks.search
+    python -m benchmarks.slugify
+    python -m benchmarks.slugs
+    python -m benchmarks.auth_cache
+    python -m benchmarks.templates
+"""
+import os
+import sys
+from pathlib import Path
+
+# Пакет common с кодом, общим для ya_news и ya_note, лежит в корне
+# репозитория, на уровень выше проекта.
+REPO_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
+
+from common.benchmarks import (  # noqa: E402, F401
+    load_results, measure, percentile, print_results, report, run_load,
+    save_results, session_cookie, test_database, wsgi_request
+)
+
+PROJECT = 'yanote'
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'{PROJECT}.settings.dev')
+    import django
+    django.setup()
@@ -0,0 +1,68 @@
+"""
+Сессия и пользователь авторизованного запроса: база против кеша.
+
+Запрашивает список заметок авторизованным клиентом с сессиями в базе
+и стандартным ModelBackend, а затем с настройками проекта: сессии
+cached_db и CachedModelBackend. Печатает число SQL-запросов на тёплый
+запрос и время ответа:
+
+    python -m benchmarks.auth_cache --repeat 500
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, test_database
+
+DATABASE_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+def run_profile(title, url, user, repeat, **overrides):
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    with override_settings(**overrides):
+        # Клиент создаётся под настройками: SessionMiddleware читает
+        # SESSION_ENGINE при сборке цепочки middleware.
+        client = Client()
+        client.force_login(user)
+
+        def get():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        get()
+        with CaptureQueriesContext(connection) as queries:
+            get()
+        report(f'{title} ({len(queries)} SQL)', measure(get, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+
+        from notes.models import Note
+
+        user = get_user_model().objects.create(username='Автор')
+        Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=user
+        )
+        url = reverse('notes:list')
+        run_profile(
+            'notes:list, auth из базы', url, user, args.repeat,
+            **DATABASE_AUTH
+        )
+        run_profile('notes:list, auth из кеша', url, user, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
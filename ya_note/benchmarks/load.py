@@ -0,0 +1,106 @@
+"""
+Нагрузочный бенчмарк всех маршрутов notes/urls.py.
+
+Заполняет временную базу синтетическими данными, прогоняет GET-запросы
+через WSGI-приложение в несколько потоков и сохраняет результат в JSON:
+
+    python -m benchmarks.load --notes 20000 --workers 8 --output before.json
+    python -m benchmarks.load ... --output after.json --compare before.json
+"""
+import argparse
+import os
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks import (PROJECT, load_results, print_results, run_load,
+                        save_results, session_cookie, setup_django,
+                        test_database)
+
+
+def seed(users, notes):
+    from django.contrib.auth import get_user_model
+
+    from notes import search
+    from notes.models import Note
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'Пользователь {index}') for index in range(users)
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    # Половина заметок принадлежит одному активному автору.
+    Note.objects.bulk_create(
+        (Note(
+            title=f'Заметка {index}',
+            text='Текст заметки. ' * 20,
+            slug=f'note-{index}',
+            author_id=user_ids[0] if index % 2 else user_ids[index % users],
+        ) for index in range(notes)),
+        batch_size=500
+    )
+    # bulk_create не отправляет сигналы, индекс поиска строится отдельно.
+    search.rebuild_index(Note.objects.all())
+
+
+def build_routes():
+    """Маршруты приложения notes с анонимным и авторизованным клиентом."""
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from django.utils.http import urlencode
+
+    from notes.models import Note
+
+    author = get_user_model().objects.order_by('pk').first()
+    note = Note.objects.filter(author=author).first()
+    cookie = session_cookie(author)
+    search_url = f"{reverse('notes:search')}?{urlencode({'q': 'заметка'})}"
+    return {
+        'notes:home (аноним)': (reverse('notes:home'), ''),
+        'notes:home': (reverse('notes:home'), cookie),
+        'notes:add': (reverse('notes:add'), cookie),
+        'notes:edit': (reverse('notes:edit', args=(note.slug,)), cookie),
+        'notes:detail': (reverse('notes:detail', args=(note.slug,)), cookie),
+        'notes:delete': (reverse('notes:delete', args=(note.slug,)), cookie),
+        'notes:list': (reverse('notes:list'), cookie),
+        'notes:success': (reverse('notes:success'), cookie),
+        'notes:search': (search_url, cookie),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--notes', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--output', default='load-results.json')
+    parser.add_argument('--compare', help='JSON предыдущего прогона.')
+    args = parser.parse_args()
+    setup_django()
+    from django.core.wsgi import get_wsgi_application
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(os.path.join(directory, 'bench.sqlite3')):
+            seed(args.users, args.notes)
+            routes = build_routes()
+            results = run_load(
+                get_wsgi_application(), routes, args.requests, args.workers
+            )
+    print_results(
+        results, load_results(args.compare) if args.compare else None
+    )
+    save_results(args.output, {
+        'project': PROJECT,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'scale': {'users': args.users, 'notes': args.notes},
+        'workers': args.workers,
+        'routes': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Время поиска по заметкам автора в зависимости от их числа.
+
+У одного «активного» автора sizes заметок, у остальных — столько же
+в сумме; поиск всегда ограничен заметками активного автора.
+
+    python -m benchmarks.search --sizes 10000 100000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django, test_database
+
+WORDS = (
+    'покупки', 'работа', 'отпуск', 'книги', 'идеи', 'встреча',
+    'проект', 'здоровье', 'рецепт', 'фильмы', 'ремонт', 'учёба',
+)
+
+
+def seed(size):
+    from django.contrib.auth import get_user_model
+
+    from notes import search
+    from notes.models import Note
+
+    User = get_user_model()
+    rng = random.Random(size)
+    Note.objects.all().delete()
+    User.objects.all().delete()
+    User.objects.bulk_create(
+        User(username=f'Пользователь {index}') for index in range(10)
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    Note.objects.bulk_create(
+        (Note(
+            title=' '.join(rng.choices(WORDS, k=3)),
+            text=' '.join(rng.choices(WORDS, k=40)) + f' пункт{index}',
+            slug=f'note-{index}',
+            # Половина заметок — у первого автора.
+            author_id=user_ids[0 if index % 2 else index % 10],
+        ) for index in range(size * 2)),
+        batch_size=1000
+    )
+    search.rebuild_index(Note.objects.all())
+    return user_ids[0]
+
+
+def run(sizes, repeat):
+    from notes.search import search_ids
+
+    for size in sizes:
+        author_id = seed(size)
+        queries = {
+            'частое слово': 'работа',
+            'два слова': 'проект и встреча',
+            'редкое слово': f'пункт{size + 1}',
+        }
+        for title, query in queries.items():
+            report(
+                f'{size} заметок, {title}',
+                measure(lambda: search_ids(author_id, query), repeat)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=(10000, 100000)
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Построение slug из заголовка: прежний двойной вызов pytils slugify
+(в NoteForm.clean_slug и в Note.save) против make_slug с быстрым путём
+для ASCII и LRU-кешем.
+
+    python -m benchmarks.slugify --titles 10000
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup_django
+
+WORDS = {
+    'кириллица': ('заметка', 'список', 'покупок', 'план', 'на', 'неделю'),
+    'ASCII': ('note', 'shopping', 'list', 'weekly', 'plan', 'draft'),
+}
+
+
+def make_titles(words, count, distinct):
+    rng = random.Random(count)
+    pool = [
+        ' '.join(rng.choices(words, k=4)) + f' {index}'
+        for index in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def run(count):
+    from pytils.translit import slugify
+
+    from notes.slugs import make_slug
+
+    for alphabet, words in WORDS.items():
+        # В массовой загрузке заголовки часто повторяются.
+        titles = make_titles(words, count, max(1, count // 10))
+
+        def double_pytils():
+            for title in titles:
+                slugify(title)
+                slugify(title)
+
+        def memoized():
+            for title in titles:
+                make_slug(title)
+
+        report(f'{alphabet}: pytils ×2', measure(double_pytils, 3))
+        make_slug.cache_clear()
+        report(f'{alphabet}: make_slug, пустой кеш', measure(memoized, 1))
+        report(f'{alphabet}: make_slug, тёплый кеш', measure(memoized, 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--titles', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+    run(args.titles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Создание заметок с одинаковыми заголовками.
+
+Каждая следующая заметка получает slug с очередным суффиксом; время
+создания печатается по пачкам, чтобы было видно, как оно меняется
+с числом уже занятых суффиксов:
+
+    python -m benchmarks.slugs --notes 100000
+"""
+import argparse
+
+from benchmarks import measure, report, setup_django, test_database
+
+
+def run(notes, batch):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from notes.models import Note
+
+    author = get_user_model().objects.create(username='Автор')
+
+    def create_batch():
+        with transaction.atomic():
+            for _ in range(batch):
+                Note.objects.create(
+                    title='Одинаковый заголовок', text='Текст', author=author
+                )
+
+    for created in range(batch, notes + 1, batch):
+        report(f'заметки {created - batch + 1}–{created}', measure(
+            create_batch, 1
+        ))
+    last = Note.objects.latest('id')
+    print(f'последний slug: {last.slug}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.notes, args.batch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes import search
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=search.INDEX_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.create_index()
+            indexed = search.rebuild_index(
+                Note.objects.all(), options['batch_size']
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано заметок: {indexed}')
+        )
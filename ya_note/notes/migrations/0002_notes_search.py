@@ -0,0 +1,51 @@
+from django.db import migrations
+
+from common.textsearch import analyze
+
+# SQL заморожен на момент миграции: notes.search может меняться дальше.
+CREATE_TABLE_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS notes_search USING '
+    "fts5(author, title, text, tokenize='unicode61 remove_diacritics 2')"
+)
+INSERT_SQL = (
+    'INSERT OR REPLACE INTO notes_search (rowid, author, title, text) '
+    'VALUES (%s, %s, %s, %s)'
+)
+DROP_TABLE_SQL = 'DROP TABLE IF EXISTS notes_search'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    Note = apps.get_model('notes', 'Note')
+    rows = Note.objects.using(connection.alias).values_list(
+        'pk', 'author', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.executemany(INSERT_SQL, [
+            (
+                pk,
+                f'u{author_id}',
+                ' '.join(analyze(title)),
+                ' '.join(analyze(text)),
+            )
+            for pk, author_id, title, text in rows.iterator()
+        ])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:10
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(django.db.models.functions.text.Length('slug'), django.db.models.expressions.F('slug'), name='note_slug_length_idx'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import F
+from django.db.models.functions import Length
 
-from pytils.translit import slugify
+from .slugs import make_slug, unique_slug
+
+# Сколько раз подбирать slug заново, если его заняли параллельно.
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -28,11 +33,46 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            # Страницы списка заметок: WHERE author = ? AND id > ?.
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            # Поиск наибольшего номера в slug: см. notes.slugs.
+            models.Index(
+                Length('slug'), F('slug'), name='note_slug_length_idx'
+            ),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Если slug не задан, подбирает свободный по заголовку.
+
+        Между подбором и вставкой slug может занять параллельный запрос;
+        тогда сработает ограничение уникальности, и slug подбирается
+        заново.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = make_slug(self.title)
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        for _ in range(SLUG_ATTEMPTS):
+            self.slug = unique_slug(
+                type(self), base, max_slug_length, self.pk, using
+            )
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if not type(self).objects.using(using).filter(
+                        slug=self.slug
+                ).exclude(pk=self.pk).exists():
+                    self.slug = ''
+                    raise
+        self.slug = ''
+        raise IntegrityError(f'Не удалось подобрать slug для «{self.title}».')
@@ -0,0 +1,85 @@
+"""
+Полнотекстовый поиск по заметкам пользователя.
+
+Индекс — виртуальная таблица SQLite FTS5 notes_search с rowid, равным id
+заметки (common.textsearch.SearchIndex). Заголовок и текст записываются
+основами слов, а автор — отдельной колонкой со служебным словом вида
+«u42». Условие на автора входит в сам запрос MATCH, поэтому FTS5
+пересекает списки документов по словам со списком заметок автора
+и не перебирает чужие заметки.
+
+Индекс обновляется сигналами при сохранении и удалении заметки,
+а целиком перестраивается командой rebuild_notes_search. Для баз,
+отличных от SQLite, поиск отключён.
+"""
+from django.db import connection
+
+from common.textsearch import INDEX_BATCH_SIZE, SearchIndex, match_words
+
+# Колонка автора не влияет на релевантность, заголовок важнее текста.
+AUTHOR_WEIGHT = 0.0
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+
+def author_token(author_id):
+    return f'u{author_id}'
+
+
+class NotesSearchIndex(SearchIndex):
+    """Индекс заметок: автор пишется служебным словом, а не основами."""
+
+    def make_row(self, pk, author_id, title, text):
+        pk, title, text = super().make_row(pk, title, text)
+        return pk, author_token(author_id), title, text
+
+
+index = NotesSearchIndex(
+    'notes_search',
+    ('author', 'title', 'text'),
+    (AUTHOR_WEIGHT, TITLE_WEIGHT, TEXT_WEIGHT),
+)
+
+
+def create_index(using=connection):
+    index.create(using)
+
+
+def index_rows(rows, using=connection):
+    """Добавляет или заменяет строки (id, id автора, заголовок, текст)."""
+    index.index_rows(rows, using)
+
+
+def index_note(note):
+    index_rows([(note.pk, note.author_id, note.title, note.text)])
+
+
+def remove_note(pk):
+    index.remove(pk)
+
+
+def rebuild_index(queryset, batch_size=INDEX_BATCH_SIZE, using=connection):
+    """
+    Перестраивает индекс по queryset заметок, пачками по batch_size.
+
+    Возвращает число проиндексированных заметок.
+    """
+    rows = queryset.values_list('pk', 'author', 'title', 'text').iterator()
+    return index.rebuild(rows, batch_size, using)
+
+
+def build_query(author_id, query):
+    """
+    Превращает запрос пользователя в выражение MATCH по его заметкам.
+
+    Все слова запроса должны встретиться в заметке.
+    """
+    words = match_words(query)
+    if not words:
+        return ''
+    return f'author:"{author_token(author_id)}" AND {{title text}}:({words})'
+
+
+def search_ids(author_id, query, offset=0, limit=10):
+    """Возвращает id подходящих заметок автора, от самых релевантных."""
+    return index.search(build_query(author_id, query), offset, limit)
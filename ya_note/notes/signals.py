@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.backends import invalidate_user
+
+from . import search
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, **kwargs):
+    search.index_note(instance)
+
+
+@receiver(post_delete, sender=Note)
+def remove_note_from_index(sender, instance, **kwargs):
+    search.remove_note(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_user_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -0,0 +1,125 @@
+"""
+Построение и подбор уникального slug для заметки.
+
+make_slug строит slug из заголовка, как pytils.translit.slugify, но
+запоминает результаты в ограниченном LRU-кеше, а заголовки из одних
+ASCII-символов обрабатывает без транслитерации: её таблица для них
+ничего не меняет, а проход по ней — самая дорогая часть slugify.
+
+Если slug из заголовка уже занят, к нему добавляется числовой суффикс:
+«zametka», «zametka-2», «zametka-3»… Следующий свободный суффикс
+находится одним запросом, а не перебором вариантов по одному.
+
+Строки сравниваются посимвольно, поэтому «zametka-9» больше, чем
+«zametka-10», и наибольший номер нельзя взять как максимум slug.
+Зато среди номеров одинаковой длины строковый порядок совпадает
+с числовым. Запрос для каждой длины номера выбирает наибольший slug
+по индексу (LENGTH(slug), slug) — это один поиск по индексу, — и
+ответом служит самый длинный из найденных номеров. Время не зависит
+от того, сколько заметок уже носит тот же заголовок.
+"""
+import re
+from functools import lru_cache
+
+from django.db import connections
+from pytils.translit import ALPHABET, slugify
+
+SLUG_CACHE_SIZE = 10_000
+# ASCII-символы, которые pytils оставляет в строке перед транслитерацией.
+_ASCII_ALPHABET = frozenset(
+    symbol for symbol in ALPHABET if len(symbol) == 1 and symbol.isascii()
+)
+_AMPERSAND = re.compile(r'&amp;|&')
+_SPACES = re.compile(r'[-\s]+')
+_NOT_SLUG = re.compile(r'[^\w\s-]')
+SEPARATOR = '-'
+MAX_SUFFIX_DIGITS = 7
+# Место под «-» и номер при обрезке длинного slug.
+SUFFIX_RESERVE = MAX_SUFFIX_DIGITS + len(SEPARATOR)
+
+
+def _ascii_slugify(title):
+    """Те же шаги, что в pytils.translit.slugify, без транслитерации."""
+    slug = _SPACES.sub('-', _AMPERSAND.sub(' and ', title.lower()))
+    slug = ''.join(symbol for symbol in slug if symbol in _ASCII_ALPHABET)
+    return _NOT_SLUG.sub('', slug).strip().lower()
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def make_slug(title):
+    """Возвращает slug для заголовка; совпадает с pytils slugify."""
+    if title.isascii():
+        return _ascii_slugify(title)
+    return slugify(title)
+
+
+def _taken_slugs_query(model, using, exclude_pk):
+    """SQL, возвращающий занятый base и наибольший номер каждой длины."""
+    quote = connections[using].ops.quote_name
+    table = quote(model._meta.db_table)
+    slug = f'{table}.{quote("slug")}'
+    exclude = ''
+    if exclude_pk is not None:
+        exclude = f' AND {table}.{quote(model._meta.pk.column)} <> %s'
+    base_query = f'SELECT {slug} FROM {table} WHERE {slug} = %s{exclude}'
+    number_query = (
+        f'SELECT * FROM (SELECT {slug} FROM {table} '
+        f'WHERE LENGTH({slug}) = %s AND {slug} >= %s AND {slug} < %s'
+        f'{exclude} ORDER BY {slug} DESC LIMIT 1) AS longest'
+    )
+    return ' UNION ALL '.join(
+        [base_query] + [number_query] * MAX_SUFFIX_DIGITS
+    )
+
+
+def _query_params(base, prefix, exclude_pk):
+    exclude = [] if exclude_pk is None else [exclude_pk]
+    params = [base] + exclude
+    for digits in range(MAX_SUFFIX_DIGITS, 0, -1):
+        # Номера из digits цифр без ведущего нуля: от «1…» до «9…».
+        params += [len(prefix) + digits, f'{prefix}1', f'{prefix}:']
+        params += exclude
+    return params
+
+
+def _suffix_number(slug, prefix):
+    suffix = slug[len(prefix):]
+    if slug.startswith(prefix) and suffix.isdigit():
+        return int(suffix)
+    return None
+
+
+def _max_number_by_scan(model, prefix, using, exclude_pk):
+    """Запасной путь: перебирает все slug вида «основа-…»."""
+    slugs = model._default_manager.using(using).filter(
+        slug__startswith=prefix
+    ).exclude(pk=exclude_pk).values_list('slug', flat=True)
+    numbers = (_suffix_number(slug, prefix) for slug in slugs.iterator())
+    return max((number for number in numbers if number), default=None)
+
+
+def unique_slug(model, base, max_length, exclude_pk=None, using='default'):
+    """
+    Возвращает base или base с ближайшим свободным номером.
+
+    exclude_pk — заметка, чей собственный slug конфликтом не считается.
+    """
+    base = base[:max_length]
+    prefix = base[:max_length - SUFFIX_RESERVE] + SEPARATOR
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            _taken_slugs_query(model, using, exclude_pk),
+            _query_params(base, prefix, exclude_pk)
+        )
+        taken = [row[0] for row in cursor.fetchall()]
+    if base not in taken:
+        return base
+    numbers = [
+        _suffix_number(slug, prefix) for slug in taken if slug != base
+    ]
+    if None in numbers:
+        # Номер вида «основа-1a» спрятал настоящий максимум своей длины.
+        number = _max_number_by_scan(model, prefix, using, exclude_pk)
+    else:
+        number = max(numbers, default=None)
+    return f'{prefix}{(number or 1) + 1}'
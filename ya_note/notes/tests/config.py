@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.models import Note
@@ -7,6 +10,12 @@ from notes.models import Note
 User = get_user_model()
 
 
+def clear_caches():
+    """Кеш не откатывается вместе с транзакцией теста — чистим вручную."""
+    for cache in caches.all():
+        cache.clear()
+
+
 class BaseFixtures(TestCase):
     # Константы для страниц
     SLUG = ('zametka',)
@@ -20,13 +29,17 @@ class BaseFixtures(TestCase):
     NOTE_ADD_URL = reverse('notes:add')
     NOTE_EDIT_URL = reverse('notes:edit', args=SLUG)
     NOTE_DELETE_URL = reverse('notes:delete', args=SLUG)
+    SEARCH_URL = reverse('notes:search')
     # Константы для заметки
     NOTE_TITLE = 'Заметка'
     NOTE_TEXT = 'Текст заметки'
     NEW_NOTE_TEXT = 'Обновлённый текст заметки'
+    # Объёмы данных для проверки бюджета запросов
+    QUERY_BUDGET_SIZES = (1, 100, 10_000)
 
     @classmethod
     def setUpTestData(cls):
+        clear_caches()
         cls.author = User.objects.create(username='Авторизованный автор')
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
@@ -41,3 +54,22 @@ class BaseFixtures(TestCase):
             author=cls.author,
             slug=cls.SLUG[0]
         )
+
+    def check_query_budget(self, make_request, seed, budget):
+        """
+        Проверяет, что страница укладывается в бюджет запросов к базе
+        и число запросов не растёт вместе с объёмом данных.
+
+        seed(size) доводит количество строк до size, make_request()
+        запрашивает страницу. Перед каждым замером кеши очищаются, чтобы
+        сессия и пользователь загружались из базы.
+        """
+        counts = {}
+        for size in self.QUERY_BUDGET_SIZES:
+            seed(size)
+            clear_caches()
+            with CaptureQueriesContext(connection) as context:
+                make_request()
+            counts[size] = len(context)
+        self.assertLessEqual(max(counts.values()), budget, counts)
+        self.assertEqual(len(set(counts.values())), 1, counts)
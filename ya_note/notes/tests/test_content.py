@@ -1,5 +1,10 @@
+from http import HTTPStatus
+
+from django.test import override_settings
+
 from .config import BaseFixtures
 from notes.forms import NoteForm
+from notes.models import Note
 
 
 class TestContent(BaseFixtures):
@@ -32,3 +37,82 @@ class TestContent(BaseFixtures):
                 response = self.author_client.get(url)
                 form = response.context.get('form')
                 self.assertIsInstance(form, NoteForm)
+
+    def test_search_is_scoped_to_author(self):
+        """
+        Поиск находит заметку по другой форме слова и не показывает
+        заметки другого пользователя.
+        """
+        Note.objects.create(
+            title='Чужая заметка', text=self.NOTE_TEXT, author=self.reader
+        )
+        response = self.author_client.get(self.SEARCH_URL, {'q': 'заметки'})
+        self.assertEqual(response.context['results'], [self.note])
+
+    @override_settings(SEARCH_RESULTS_PER_PAGE=2)
+    def test_search_ranks_and_pages(self):
+        """
+        Совпадения в заголовке идут первыми, а результаты разбиты
+        на страницы без пропусков и повторов.
+        """
+        in_title = Note.objects.create(
+            title='Текст доклада', text='Черновик', author=self.author,
+            slug='doklad'
+        )
+        in_text = Note.objects.create(
+            title='Черновик', text='Текст', author=self.author,
+            slug='chernovik'
+        )
+        first_page = self.author_client.get(
+            self.SEARCH_URL, {'q': 'текст'}
+        ).context
+        second_page = self.author_client.get(
+            self.SEARCH_URL, {'q': 'текст', 'page': first_page['next_page']}
+        ).context
+        found = first_page['results'] + second_page['results']
+        self.assertEqual(found[0], in_title)
+        self.assertCountEqual(found, [in_title, in_text, self.note])
+        self.assertNotIn('next_page', second_page)
+
+    def test_search_invalid_page(self):
+        """Номер страницы вне 1..MAX_PAGE приводит к ошибке 404."""
+        for page in ('0', 'abc', '1001', '1' * 30):
+            with self.subTest(page=page):
+                response = self.author_client.get(
+                    self.SEARCH_URL, {'q': 'текст', 'page': page}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_notes_list_pages(self):
+        """
+        Список заметок выводится страницами по курсору, без пропусков
+        и повторов, и без загрузки текста заметок.
+        """
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text=self.NOTE_TEXT,
+                 slug=f'note-{index}', author=self.author)
+            for index in range(2)
+        )
+        first_page = self.author_client.get(self.NOTES_URL).context
+        second_page = self.author_client.get(
+            self.NOTES_URL, {'cursor': first_page['next_cursor']}
+        ).context
+        found = list(first_page['object_list']) + list(
+            second_page['object_list']
+        )
+        self.assertEqual(
+            [note.id for note in found],
+            list(Note.objects.order_by('id').values_list('id', flat=True))
+        )
+        self.assertNotIn('next_cursor', second_page)
+        self.assertIn('text', found[0].get_deferred_fields())
+
+    def test_notes_list_invalid_cursor(self):
+        """Некорректный курсор или курсор вне 64 бит — ошибка 404."""
+        for cursor in ('abc', '1' * 30, str(2 ** 63), str(-2 ** 63 - 1)):
+            with self.subTest(cursor=cursor):
+                response = self.author_client.get(
+                    self.NOTES_URL, {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
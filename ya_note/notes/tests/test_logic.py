@@ -1,10 +1,30 @@
 from http import HTTPStatus
+import importlib
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.management import call_command
+from django.db.utils import ConnectionHandler
+from django.template import TemplateSyntaxError, engines
+from django.test import Client, SimpleTestCase, override_settings
 from pytils.translit import slugify
 
-from .config import BaseFixtures
+from common.backends import (
+    CachedModelBackend, get_user_cache, user_cache_key
+)
+from common.warmup import warm_up_templates
+
+from .config import BaseFixtures, User
 from notes.forms import WARNING
 from notes.models import Note
+from notes.search import search_ids
+from notes.slugs import make_slug
 
 
 class TestNoteCreation(BaseFixtures):
@@ -41,7 +61,7 @@ class TestNoteCreation(BaseFixtures):
         prev_notes_count = Note.objects.count()
         response = self.author_client.post(
             self.NOTE_ADD_URL,
-            data=self.form_data
+            data={**self.form_data, 'slug': self.note.slug}
         )
         cur_notes_count = Note.objects.count()
         self.assertEqual(cur_notes_count, prev_notes_count)
@@ -52,6 +72,66 @@ class TestNoteCreation(BaseFixtures):
             errors=(self.note.slug + WARNING)
         )
 
+    def test_autocreated_slug_gets_free_suffix(self):
+        """
+        Если slug из заголовка занят, к нему добавляется
+        следующий свободный числовой суффикс.
+        """
+        for expected_slug in ('zametka-2', 'zametka-3'):
+            with self.subTest(slug=expected_slug):
+                response = self.author_client.post(
+                    self.NOTE_ADD_URL, data=self.form_data
+                )
+                self.assertRedirects(response, self.SUCCESS_URL)
+                self.assertTrue(
+                    Note.objects.filter(slug=expected_slug).exists()
+                )
+        Note.objects.create(
+            title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.author,
+            slug='zametka-10'
+        )
+        note = Note.objects.create(
+            title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.author
+        )
+        self.assertEqual(note.slug, 'zametka-11')
+
+    def test_make_slug_matches_pytils(self):
+        """Быстрый путь для ASCII и кеш не меняют результат slugify."""
+        titles = (
+            self.NOTE_TITLE,
+            'Shopping list & plans',
+            '  Tom\'s   "notes" #1 -- draft_v2 ',
+            'Смешанный title: Ёжик №5',
+        )
+        for title in titles:
+            with self.subTest(title=title):
+                self.assertEqual(make_slug(title), slugify(title))
+                self.assertEqual(make_slug(title), slugify(title))
+
+    def test_slug_suffix_skips_non_numeric_slugs(self):
+        """Slug вида «zametka-1a» не сбивает подбор следующего номера."""
+        for slug in ('zametka-1a', 'zametka-12'):
+            Note.objects.create(
+                title=self.NOTE_TITLE, text=self.NOTE_TEXT,
+                author=self.author, slug=slug
+            )
+        note = Note.objects.create(
+            title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.author
+        )
+        self.assertEqual(note.slug, 'zametka-13')
+
+    def test_slug_is_reselected_after_conflict(self):
+        """Если slug заняли между подбором и вставкой, он подбирается снова."""
+        with mock.patch(
+                'notes.models.unique_slug',
+                side_effect=(self.note.slug, 'zametka-2')
+        ):
+            note = Note.objects.create(
+                title=self.NOTE_TITLE, text=self.NOTE_TEXT,
+                author=self.author
+            )
+        self.assertEqual(note.slug, 'zametka-2')
+
     def test_autocreate_slug_if_not_exist(self):
         """Slug формируется автоматически из заголовка."""
         Note.objects.all().delete()
@@ -108,3 +188,180 @@ class TestNoteEditDelete(BaseFixtures):
         self.assertEqual(new_note.text, self.note.text)
         self.assertEqual(new_note.title, self.note.title)
         self.assertEqual(new_note.author, self.note.author)
+
+
+class TestNoteSearchIndex(BaseFixtures):
+    """Класс, тестирующий обновление поискового индекса заметок."""
+
+    def test_index_follows_note_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        author_id = self.author.pk
+        self.assertEqual(search_ids(author_id, 'заметка'), [self.note.pk])
+        self.note.title = 'Список продуктов'
+        self.note.text = 'Хлеб'
+        self.note.save()
+        self.assertEqual(search_ids(author_id, 'заметка'), [])
+        self.assertEqual(search_ids(author_id, 'продукты'), [self.note.pk])
+        self.assertEqual(search_ids(self.reader.pk, 'продукты'), [])
+        self.note.delete()
+        self.assertEqual(search_ids(author_id, 'продукты'), [])
+
+    def test_rebuild_notes_search_command(self):
+        """Заметки, созданные в обход сигналов, индексируются командой."""
+        Note.objects.bulk_create(
+            Note(title='Поход', text='Палатка', author=self.author,
+                 slug=f'pohod-{index}')
+            for index in range(3)
+        )
+        self.assertEqual(search_ids(self.author.pk, 'палатка'), [])
+        out = StringIO()
+        call_command('rebuild_notes_search', '--batch-size', '2', stdout=out)
+        self.assertEqual(len(search_ids(self.author.pk, 'палатка')), 3)
+        self.assertIn('Проиндексировано заметок: 4', out.getvalue())
+
+
+class TestCachedUser(BaseFixtures):
+    """Класс, тестирующий кеш пользователей сессии."""
+
+    def test_cached_user_is_invalidated(self):
+        """Запись о пользователе сбрасывается при сохранении и выходе."""
+        backend = CachedModelBackend()
+        key = user_cache_key(self.author.pk)
+        self.assertEqual(backend.get_user(self.author.pk), self.author)
+        self.author.username = 'Новое имя'
+        self.author.save()
+        self.assertIsNone(get_user_cache().get(key))
+        self.assertEqual(
+            backend.get_user(self.author.pk).username, 'Новое имя'
+        )
+        self.author_client.get(self.LOGOUT_URL)
+        self.assertIsNone(get_user_cache().get(key))
+
+    def test_user_cache_can_be_disabled(self):
+        """С AUTH_USER_CACHE_TIMEOUT = 0 пользователь не попадает в кеш."""
+        with override_settings(AUTH_USER_CACHE_TIMEOUT=0):
+            self.assertEqual(
+                CachedModelBackend().get_user(self.author.pk), self.author
+            )
+        self.assertIsNone(get_user_cache().get(user_cache_key(self.author.pk)))
+
+    def test_model_backend_sessions_stay_valid(self):
+        """Сессии с путём ModelBackend после смены бэкенда не сбрасываются."""
+        client = Client()
+        client.force_login(
+            self.author, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = client.get(self.NOTES_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.wsgi_request.user, self.author)
+
+    def test_wrong_password_is_checked_once(self):
+        """Неверный пароль проверяется одним бэкендом, а не обоими."""
+        self.author.set_password('верный-пароль')
+        self.author.save()
+        with mock.patch.object(
+                User, 'check_password', autospec=True, return_value=False
+        ) as check_password:
+            self.assertIsNone(authenticate(
+                username=self.author.username, password='неверный'
+            ))
+        self.assertEqual(check_password.call_count, 1)
+
+
+class TestProdSettings(SimpleTestCase):
+    """Класс, тестирующий боевые настройки."""
+
+    def load_prod_settings(self, **env):
+        with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'test'}):
+            os.environ.pop('DJANGO_CACHE_BACKEND', None)
+            os.environ.update(env)
+            return importlib.reload(
+                importlib.import_module('yanote.settings.prod')
+            )
+
+    def test_sessions_stay_in_database_without_shared_cache(self):
+        """Без общего кеша сессии и пользователи читаются из базы."""
+        prod = self.load_prod_settings()
+        self.assertEqual(
+            prod.SESSION_ENGINE, 'django.contrib.sessions.backends.db'
+        )
+        self.assertEqual(prod.AUTH_USER_CACHE_TIMEOUT, 0)
+
+    def test_shared_cache_keeps_cached_sessions(self):
+        """С общим кешем сессии и пользователи берутся из кеша."""
+        prod = self.load_prod_settings(
+            DJANGO_CACHE_BACKEND='django.core.cache.backends.dummy.DummyCache'
+        )
+        self.assertEqual(
+            prod.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db'
+        )
+        self.assertEqual(prod.AUTH_USER_CACHE_TIMEOUT, 300)
+
+
+class TestSqliteBackend(SimpleTestCase):
+    """Класс, тестирующий бэкенд SQLite с PRAGMA из настроек."""
+
+    def test_pragmas_are_applied(self):
+        """Новое соединение получает PRAGMA профиля производительности."""
+        with tempfile.TemporaryDirectory() as directory:
+            handler = ConnectionHandler({'default': {
+                'ENGINE': 'common.sqlite',
+                'NAME': Path(directory) / 'db.sqlite3',
+                'OPTIONS': {'pragmas': settings.SQLITE_PERFORMANCE_PRAGMAS},
+            }})
+            try:
+                with handler['default'].cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone(), ('wal',))
+                    cursor.execute('PRAGMA synchronous')
+                    self.assertEqual(cursor.fetchone(), (1,))  # NORMAL
+            finally:
+                handler.close_all()
+
+
+class TestTemplateWarmUp(SimpleTestCase):
+    """Класс, тестирующий предварительную компиляцию шаблонов."""
+
+    CACHED_TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'],
+            'loaders': [('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+            ])],
+        },
+    }]
+
+    def test_warm_up_fills_cached_loader(self):
+        """Прогрев компилирует все шаблоны проекта в кеш загрузчика."""
+        templates = list((settings.BASE_DIR / 'templates').rglob('*.html'))
+        with override_settings(TEMPLATES=self.CACHED_TEMPLATES):
+            self.assertEqual(warm_up_templates(), len(templates))
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertEqual(
+                len(loader.get_template_cache), len(templates)
+            )
+
+    def test_warm_up_fails_on_syntax_error(self):
+        """Ошибка синтаксиса в шаблоне обнаруживается при прогреве."""
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, 'broken.html').write_text(
+                '{% if %}', encoding='utf-8'
+            )
+            with override_settings(TEMPLATES=[
+                {**settings.TEMPLATES[0], 'DIRS': [directory]}
+            ]):
+                with self.assertRaises(TemplateSyntaxError):
+                    warm_up_templates()
+
+    def test_app_ready_warms_up_templates(self):
+        """Приложение прогревает шаблоны при старте, если это включено."""
+        for precompiled, calls in ((True, 1), (False, 0)):
+            with self.subTest(precompiled=precompiled):
+                with override_settings(TEMPLATES_PRECOMPILED=precompiled):
+                    with mock.patch(
+                        'common.warmup.warm_up_templates'
+                    ) as warm_up:
+                        apps.get_app_config('notes').ready()
+                self.assertEqual(warm_up.call_count, calls)
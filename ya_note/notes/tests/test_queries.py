@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .config import BaseFixtures
+from notes.models import Note
+
+
+class TestQueryBudget(BaseFixtures):
+    """Класс, проверяющий число запросов к базе на страницах заметок."""
+
+    # Сессия, пользователь и сами заметки.
+    NOTES_LIST_BUDGET = 3
+    NOTE_DETAIL_BUDGET = 3
+    # Запросы, которых не должно быть при тёплом кеше.
+    AUTH_TABLES = ('FROM "django_session"', 'FROM "auth_user"')
+
+    def seed_notes(self, size):
+        """Доводит число заметок автора до size."""
+        Note.objects.bulk_create(
+            Note(
+                title=f'{self.NOTE_TITLE} {index}',
+                text=self.NOTE_TEXT,
+                slug=f'note-{index}',
+                author=self.author
+            )
+            for index in range(
+                Note.objects.filter(author=self.author).count(), size
+            )
+        )
+
+    def test_query_budget(self):
+        """Страницы укладываются в бюджет при 1, 100 и 10 000 заметок."""
+        test_cases = (
+            (self.NOTES_URL, self.NOTES_LIST_BUDGET),
+            (self.NOTE_DETAIL_URL, self.NOTE_DETAIL_BUDGET),
+        )
+        for url, budget in test_cases:
+            with self.subTest(name=url):
+                self.check_query_budget(
+                    lambda: self.author_client.get(url),
+                    self.seed_notes,
+                    budget
+                )
+
+    def test_warm_cache_skips_session_and_user_queries(self):
+        """Повторный запрос берёт сессию и пользователя из кеша."""
+        self.author_client.get(self.NOTES_URL)
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.get(self.NOTES_URL)
+        auth_queries = [
+            query['sql'] for query in context.captured_queries
+            if any(table in query['sql'] for table in self.AUTH_TABLES)
+        ]
+        self.assertEqual(auth_queries, [])
+
+    def test_notes_list_uses_index(self):
+        """Страница списка заметок выбирается по индексу, без сортировки."""
+        self.seed_notes(100)
+        with CaptureQueriesContext(connection) as context:
+            self.author_client.get(self.NOTES_URL, {'cursor': self.note.id})
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "notes_note"' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('USING', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
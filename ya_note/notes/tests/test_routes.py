@@ -1,6 +1,12 @@
+import tempfile
 from http import HTTPStatus
+from pathlib import Path
 
-from .config import BaseFixtures
+from django.test import Client, override_settings
+
+from common.profiling import profiling_summary, reset_profiling_summary
+
+from .config import BaseFixtures, User
 
 
 class TestRoutes(BaseFixtures):
@@ -19,6 +25,7 @@ class TestRoutes(BaseFixtures):
             (self.NOTES_URL, self.reader_client, HTTPStatus.OK),
             (self.SUCCESS_URL, self.reader_client, HTTPStatus.OK),
             (self.NOTE_ADD_URL, self.reader_client, HTTPStatus.OK),
+            (self.SEARCH_URL, self.reader_client, HTTPStatus.OK),
             (self.NOTE_DETAIL_URL, self.reader_client, HTTPStatus.NOT_FOUND),
             (self.NOTE_DETAIL_URL, self.author_client, HTTPStatus.OK),
             (self.NOTE_EDIT_URL, self.reader_client, HTTPStatus.NOT_FOUND),
@@ -39,7 +46,8 @@ class TestRoutes(BaseFixtures):
             self.SUCCESS_URL,
             self.NOTE_ADD_URL,
             self.NOTE_EDIT_URL,
-            self.NOTE_DELETE_URL
+            self.NOTE_DELETE_URL,
+            self.SEARCH_URL
         )
 
         for url in urls:
@@ -47,3 +55,63 @@ class TestRoutes(BaseFixtures):
                 redirect_url = f'{self.LOGIN_URL}?next={url}'
                 response = self.client.get(url)
                 self.assertRedirects(response, redirect_url)
+
+    def test_profiling_middleware(self):
+        """
+        Профилирующий middleware отдаёт Server-Timing, копит статистику
+        по маршруту и по заголовку сохраняет профиль cProfile.
+        """
+        # Новый клиент: цепочка middleware собирается при первом запросе.
+        client = Client()
+        client.force_login(self.author)
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(
+                    REQUEST_PROFILING=True,
+                    REQUEST_PROFILING_DUMP_DIR=dump_dir,
+                    DEBUG=True
+            ):
+                reset_profiling_summary()
+                response = client.get(self.NOTES_URL, HTTP_X_PROFILE='1')
+            server_timing = response['Server-Timing']
+            for metric in ('sql;', 'template;', 'view;', 'total;'):
+                with self.subTest(metric=metric):
+                    self.assertIn(metric, server_timing)
+            # Сессия уже в кеше: пользователь и заметки.
+            self.assertIn('2 queries', server_timing)
+            self.assertEqual(
+                profiling_summary()['notes:list']['requests'], 1
+            )
+            self.assertEqual(
+                len(list(Path(dump_dir).glob('notes-list-*.prof'))), 1
+            )
+
+    def test_profiling_header_needs_staff_or_debug(self):
+        """
+        Профиль по заголовку снимается только для сотрудника или при
+        DEBUG, а в каталоге остаются REQUEST_PROFILING_MAX_DUMPS последних.
+        """
+        staff = User.objects.create(username='Сотрудник', is_staff=True)
+        test_cases = (
+            (None, False, 0),
+            (self.reader, False, 0),
+            (staff, False, 1),
+            (None, True, 2),
+            # Третий профиль вытесняет самый старый.
+            (staff, False, 2),
+        )
+        with tempfile.TemporaryDirectory() as dump_dir:
+            with override_settings(
+                    REQUEST_PROFILING=True,
+                    REQUEST_PROFILING_DUMP_DIR=dump_dir,
+                    REQUEST_PROFILING_MAX_DUMPS=2
+            ):
+                for user, debug, dumps in test_cases:
+                    with self.subTest(user=user, debug=debug):
+                        client = Client()
+                        if user is not None:
+                            client.force_login(user)
+                        with override_settings(DEBUG=debug):
+                            client.get(self.HOME_URL, HTTP_X_PROFILE='1')
+                        self.assertEqual(
+                            len(list(Path(dump_dir).glob('*.prof'))), dumps
+                        )
@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.views import generic
 
+from common.limits import fits_sql_integer
+from common.textsearch import parse_page
+
 from .forms import NoteForm
 from .models import Note
+from .search import search_ids
 
 
 class Home(generic.TemplateView):
@@ -50,9 +56,82 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя.
+
+    Заметки выводятся страницами по NOTES_COUNT_ON_LIST_PAGE в порядке id;
+    следующая страница начинается после id из параметра cursor, без
+    OFFSET. Текст заметок в списке не нужен и не загружается.
+    """
     template_name = 'notes/list.html'
 
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor')
+        if cursor is None:
+            return None
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            raise Http404('Некорректный курсор страницы.')
+        # Число вне 64 бит в запросе к базе дало бы OverflowError.
+        if not fits_sql_integer(cursor):
+            raise Http404('Некорректный курсор страницы.')
+        return cursor
+
+    def get_queryset(self):
+        notes = super().get_queryset().only('title', 'slug').order_by('id')
+        cursor = self.get_cursor()
+        if cursor is not None:
+            notes = notes.filter(id__gt=cursor)
+        return notes[:settings.NOTES_COUNT_ON_LIST_PAGE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        notes = context['object_list']
+        if len(notes) == settings.NOTES_COUNT_ON_LIST_PAGE:
+            context['next_cursor'] = notes[len(notes) - 1].id
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """
+    Поиск по заметкам пользователя.
+
+    Результаты упорядочены по релевантности и выводятся постранично;
+    найденные id дополнительно ограничиваются get_queryset, поэтому
+    чужие заметки не попадут в выдачу даже при устаревшем индексе.
+    """
+    template_name = 'notes/search.html'
+    context_object_name = 'results'
+
+    def get_page_number(self):
+        return parse_page(self.request.GET.get('page', 1))
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        self.page = self.get_page_number()
+        per_page = settings.SEARCH_RESULTS_PER_PAGE
+        # Одна лишняя запись показывает, есть ли следующая страница.
+        ids = search_ids(
+            self.request.user.pk,
+            self.query,
+            (self.page - 1) * per_page,
+            per_page + 1
+        )
+        self.has_next = len(ids) > per_page
+        ids = ids[:per_page]
+        found = super().get_queryset().in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        if self.page > 1:
+            context['previous_page'] = self.page - 1
+        if self.has_next:
+            context['next_page'] = self.page + 1
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
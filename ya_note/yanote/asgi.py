@@ -8,9 +8,17 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
 import os
+import sys
+from pathlib import Path
 
-from django.core.asgi import get_asgi_application
+# Пакет common с кодом, общим для ya_news и ya_note, лежит в корне
+# репозитория, на уровень выше проекта.
+REPO_DIR = str(Path(__file__).resolve().parent.parent.parent)
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings.prod')
 
 application = get_asgi_application()
@@ -0,0 +1,151 @@
+"""
+Общие настройки проекта.
+
+Запускать стоит не этот модуль, а yanote.settings.dev для разработки
+и тестов или yanote.settings.prod для боевого запуска.
+"""
+from pathlib import Path
+
+from django.urls import reverse_lazy
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+DEBUG = False
+
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'notes.apps.NotesConfig'
+]
+
+MIDDLEWARE = [
+    # Первым, чтобы замер охватывал все остальные middleware.
+    'common.profiling.ProfilingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yanote.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+# Компилировать ли все шаблоны при старте приложения (common.warmup).
+# Включается в prod вместе с кеширующим загрузчиком.
+TEMPLATES_PRECOMPILED = False
+
+WSGI_APPLICATION = 'yanote.wsgi.application'
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+# PRAGMA для нагруженного режима (yanote.settings.prod): WAL, чтобы
+# читатели не мешали писателю, и ожидание блокировки вместо ошибки.
+SQLITE_PERFORMANCE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер кеша в КиБ: 64 МиБ.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Сессии и пользователи в отдельном кеше, чтобы их не вытесняли
+    # другие записи. Для нескольких процессов нужен общий бэкенд.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# cached_db читает сессию из кеша и пишет и в кеш, и в базу: промах
+# кеша стоит одного запроса, а не потерянной сессии. Чисто кешевый
+# движок django.contrib.sessions.backends.cache обходится без базы.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Пользователь сессии берётся из кеша (common.backends.CachedModelBackend).
+# ModelBackend остаётся в списке: сессии, созданные до появления
+# кеширующего бэкенда, хранят его путь и без него были бы сброшены.
+AUTHENTICATION_BACKENDS = [
+    'common.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_ALIAS = 'sessions'
+AUTH_USER_CACHE_TIMEOUT = 300
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'Europe/Moscow'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+STATIC_URL = '/static/'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+LOGIN_URL = reverse_lazy('users:login')
+LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+SEARCH_RESULTS_PER_PAGE = 10
+
+# Профилирование запросов (common.profiling.ProfilingMiddleware).
+REQUEST_PROFILING = False
+REQUEST_PROFILING_SAMPLE_RATE = 0.0
+REQUEST_PROFILING_HEADER = 'X-Profile'
+REQUEST_PROFILING_DUMP_DIR = BASE_DIR / 'profiles'
+REQUEST_PROFILING_MAX_DUMPS = 100
+REQUEST_PROFILING_WINDOW = 1000
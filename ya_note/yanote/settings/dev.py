@@ -0,0 +1,8 @@
+"""Настройки для разработки и тестов."""
+from .base import *
+
+SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
+
+DEBUG = True
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
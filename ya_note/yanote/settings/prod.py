@@ -0,0 +1,94 @@
+"""
+Настройки для боевого запуска.
+
+Значения, зависящие от окружения, задаются переменными окружения:
+DJANGO_SECRET_KEY (обязательна), DJANGO_ALLOWED_HOSTS (имена через
+запятую), DJANGO_DB_PATH, DJANGO_CONN_MAX_AGE, DJANGO_STATIC_ROOT,
+DJANGO_CACHE_BACKEND и DJANGO_CACHE_LOCATION.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *
+
+# При DEBUG Django хранит в памяти каждый выполненный SQL-запрос.
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Не задана переменная DJANGO_SECRET_KEY.')
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get(
+        'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+    ).split(',')
+    if host.strip()
+]
+
+# Ответ проходит middleware в обратном порядке: ConditionalGetMiddleware
+# считает ETag по несжатому телу, а GZipMiddleware затем сжимает ответ
+# и делает ETag слабым. Оба стоят до middleware, меняющих тело ответа.
+_SECURITY = MIDDLEWARE.index('django.middleware.security.SecurityMiddleware')
+MIDDLEWARE = [
+    *MIDDLEWARE[:_SECURITY + 1],
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    *MIDDLEWARE[_SECURITY + 1:],
+]
+
+# Шаблоны разбираются один раз на процесс и компилируются при старте.
+# Явный список загрузчиков несовместим с APP_DIRS.
+TEMPLATES_PRECOMPILED = True
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+# WAL, PRAGMA на каждом соединении и постоянные соединения.
+DATABASES = {
+    'default': {
+        'ENGINE': 'common.sqlite',
+        'NAME': os.environ.get('DJANGO_DB_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'OPTIONS': {'pragmas': SQLITE_PERFORMANCE_PRAGMAS},
+    },
+}
+
+# Кеш в памяти у каждого процесса свой: выход из системы и смена
+# пароля в одном процессе не видны остальным. При нескольких
+# процессах все алиасы переводятся на общий бэкенд, например
+# django.core.cache.backends.memcached.PyMemcacheCache.
+if 'DJANGO_CACHE_BACKEND' in os.environ:
+    CACHES = {
+        alias: {
+            'BACKEND': os.environ['DJANGO_CACHE_BACKEND'],
+            'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+            'KEY_PREFIX': alias,
+        }
+        for alias in CACHES
+    }
+else:
+    # Без общего кеша сессия и её пользователь читаются из базы: иначе
+    # выход из системы, отключение пользователя и смена пароля не дошли
+    # бы до других процессов, и сессия жила бы там до SESSION_COOKIE_AGE.
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTH_USER_CACHE_TIMEOUT = 0
+
+# Файлы с хешем содержимого в имени можно кешировать в браузере
+# бессрочно; перед запуском нужен collectstatic.
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'static')
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)